@@ -2,9 +2,13 @@ from fastapi import Request, status
 from fastapi.responses import JSONResponse
 
 from app.core.custom_exceptions import (
+    ActivityNotFoundError,
     AddressNotFoundError,
     AlreadyManyTokensError,
+    BatchTooLargeError,
+    InvalidCursorError,
     OrganizationNotFoundError,
+    SearchTimeoutError,
     UserHasNoTokensError,
 )
 
@@ -47,3 +51,39 @@ async def address_not_exists_error(
         status_code=status.HTTP_404_NOT_FOUND,
         content={"detail": "This address does not exist"},
     )
+
+
+async def activity_not_exists_error(
+    request: Request, exc: ActivityNotFoundError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={"detail": "This activity does not exist"},
+    )
+
+
+async def invalid_cursor_error(
+    request: Request, exc: InvalidCursorError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "The pagination cursor is invalid"},
+    )
+
+
+async def search_timeout_error(
+    request: Request, exc: SearchTimeoutError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "The search took too long, try a more specific query"},
+    )
+
+
+async def batch_too_large_error(
+    request: Request, exc: BatchTooLargeError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": "The batch has too many ids and names"},
+    )
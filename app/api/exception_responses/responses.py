@@ -32,6 +32,23 @@ def create_error_responses(
     return responses
 
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+ndjson_stream_responses: dict[int | str, dict[str, Any]] = {
+    200: {
+        "description": "Successful Response",
+        "content": {
+            NDJSON_MEDIA_TYPE: {
+                "schema": {
+                    "type": "string",
+                    "description": "one organization JSON object per line, "
+                    "returned when the request accepts application/x-ndjson",
+                }
+            }
+        },
+    },
+}
+
 issue_token_exceptions = {
     400: {
         "many_tokens_error": {
@@ -81,6 +98,10 @@ get_organizations_by_address_exceptions = {
             "summary": "TheLimitExceededError",
             "value": {"detail": "The limit of requests exceeded"},
         },
+        "invalid_cursor_error": {
+            "summary": "InvalidCursorError",
+            "value": {"detail": "The pagination cursor is invalid"},
+        },
     },
     401: {
         "missing_or_bad_token": {
@@ -106,6 +127,10 @@ get_organizations_by_activity_exceptions = {
             "summary": "TheLimitExceededError",
             "value": {"detail": "The limit of requests exceeded"},
         },
+        "invalid_cursor_error": {
+            "summary": "InvalidCursorError",
+            "value": {"detail": "The pagination cursor is invalid"},
+        },
     },
     401: {
         "missing_or_bad_token": {
@@ -146,6 +171,95 @@ get_organization_by_id_geo_exceptions = {
     },
 }
 
+get_organizations_by_geo_exceptions = {
+    400: {
+        "limit_exceed_error": {
+            "summary": "TheLimitExceededError",
+            "value": {"detail": "The limit of requests exceeded"},
+        },
+        "invalid_cursor_error": {
+            "summary": "InvalidCursorError",
+            "value": {"detail": "The pagination cursor is invalid"},
+        },
+    },
+    401: {
+        "missing_or_bad_token": {
+            "summary": "MissingOrBadTokenError",
+            "value": {"detail": "The token is missing or bad"},
+        },
+    },
+}
+
+get_nearest_organizations_exceptions = {
+    400: {
+        "limit_exceed_error": {
+            "summary": "TheLimitExceededError",
+            "value": {"detail": "The limit of requests exceeded"},
+        },
+    },
+    401: {
+        "missing_or_bad_token": {
+            "summary": "MissingOrBadTokenError",
+            "value": {"detail": "The token is missing or bad"},
+        },
+    },
+}
+
+get_organizations_in_box_exceptions = {
+    400: {
+        "limit_exceed_error": {
+            "summary": "TheLimitExceededError",
+            "value": {"detail": "The limit of requests exceeded"},
+        },
+    },
+    401: {
+        "missing_or_bad_token": {
+            "summary": "MissingOrBadTokenError",
+            "value": {"detail": "The token is missing or bad"},
+        },
+    },
+}
+
+search_organizations_exceptions = {
+    400: {
+        "limit_exceed_error": {
+            "summary": "TheLimitExceededError",
+            "value": {"detail": "The limit of requests exceeded"},
+        },
+    },
+    401: {
+        "missing_or_bad_token": {
+            "summary": "MissingOrBadTokenError",
+            "value": {"detail": "The token is missing or bad"},
+        },
+    },
+    503: {
+        "search_timeout_error": {
+            "summary": "SearchTimeoutError",
+            "value": {"detail": "The search took too long, try a more specific query"},
+        },
+    },
+}
+
+get_organizations_batch_exceptions = {
+    400: {
+        "limit_exceed_error": {
+            "summary": "TheLimitExceededError",
+            "value": {"detail": "The limit of requests exceeded"},
+        },
+        "batch_too_large_error": {
+            "summary": "BatchTooLargeError",
+            "value": {"detail": "The batch has too many ids and names"},
+        },
+    },
+    401: {
+        "missing_or_bad_token": {
+            "summary": "MissingOrBadTokenError",
+            "value": {"detail": "The token is missing or bad"},
+        },
+    },
+}
+
 
 issue_token_responses = create_error_responses(issue_token_exceptions)
 get_all_tokens_responses = create_error_responses(get_all_tokens_exceptions)
@@ -161,3 +275,16 @@ get_organizations_by_activity_responses = create_error_responses(
 get_organization_by_id_geo_responses = create_error_responses(
     get_organization_by_id_geo_exceptions
 )
+get_organizations_by_geo_responses = create_error_responses(
+    get_organizations_by_geo_exceptions
+)
+get_nearest_organizations_responses = create_error_responses(
+    get_nearest_organizations_exceptions
+)
+get_organizations_in_box_responses = create_error_responses(
+    get_organizations_in_box_exceptions
+)
+search_organizations_responses = create_error_responses(search_organizations_exceptions)
+get_organizations_batch_responses = create_error_responses(
+    get_organizations_batch_exceptions
+)
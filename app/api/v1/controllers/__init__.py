@@ -1,4 +1,5 @@
+from .metrics_routes import metrics_router
 from .organization_routes import organization_router
 from .token_routes import token_router
 
-__all__ = ["token_router", "organization_router"]
+__all__ = ["token_router", "organization_router", "metrics_router"]
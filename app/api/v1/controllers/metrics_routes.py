@@ -0,0 +1,16 @@
+from dishka.integrations.fastapi import FromDishka, inject
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, MetricsRegistry
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get(
+    "",
+    include_in_schema=False,
+    description="endpoint for scraping the metrics in the Prometheus text format",
+)
+@inject
+async def get_metrics(registry: FromDishka[MetricsRegistry]) -> Response:
+    return Response(registry.render(), media_type=CONTENT_TYPE)
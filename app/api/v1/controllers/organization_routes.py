@@ -1,25 +1,119 @@
+from collections.abc import AsyncIterator
+from typing import Annotated, Any
+
 from dishka.integrations.fastapi import FromDishka, inject
-from fastapi import APIRouter
-from pydantic import UUID4
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import UUID4, ValidationError
 
 from app.api.exception_responses.responses import (
+    NDJSON_MEDIA_TYPE,
+    get_nearest_organizations_responses,
     get_organization_by_id_geo_responses,
     get_organization_by_name_responses,
+    get_organizations_batch_responses,
     get_organizations_by_activity_responses,
     get_organizations_by_address_responses,
+    get_organizations_by_geo_responses,
+    get_organizations_in_box_responses,
+    ndjson_stream_responses,
+    search_organizations_responses,
+)
+from app.core.configs import all_settings
+from app.core.models.pydantic_models import (
+    BoundingBox,
+    Organization,
+    OrganizationBatchItem,
+    OrganizationBatchRequest,
+    OrganizationPage,
+    OrganizationsInBox,
+    OrganizationWithDistance,
+    OrganizationWithRank,
 )
-from app.core.models.pydantic_models import Organization
 from app.core.schemas.service_protocols import (
+    GetNearestOrganizationsServiceProtocol,
     GetOrganizationByIDServiceProtocol,
     GetOrganizationByNameServiceProtocol,
+    GetOrganizationsBatchServiceProtocol,
     GetOrganizationsFromActivityServiceProtocol,
     GetOrganizationsFromAddressServiceProtocol,
     GetOrganizationsFromAncestorActivityServiceProtocol,
     GetOrganizationsFromGeoServiceProtocol,
+    GetOrganizationsInBoxServiceProtocol,
+    SearchOrganizationsServiceProtocol,
+    StreamOrganizationsFromActivityServiceProtocol,
+    StreamOrganizationsFromAddressServiceProtocol,
+    StreamOrganizationsFromAncestorActivityServiceProtocol,
+    StreamOrganizationsFromGeoServiceProtocol,
 )
 
 organization_router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+PageLimit = Annotated[
+    int,
+    Query(
+        ge=1,
+        le=all_settings.pagination.max_limit,
+        description="maximum number of organizations in the page",
+    ),
+]
+PageCursor = Annotated[
+    str | None,
+    Query(description=f"cursor of the next page from the {NEXT_CURSOR_HEADER} header"),
+]
+
+
+def page_items(response: Response, page: OrganizationPage) -> list[Organization]:
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+def accepts_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def resolve(request: Request, dependency: Any) -> Any:
+    """Resolves a dependency from the request container of dishka.
+
+    List endpoints answer either with a page or with an NDJSON stream, so they
+    resolve only the service of the branch taken instead of injecting both.
+    """
+    return await request.state.dishka_container.get(dependency)
+
+
+def ndjson_response(organizations: AsyncIterator[Organization]) -> StreamingResponse:
+    async def lines() -> AsyncIterator[bytes]:
+        async for organization in organizations:
+            yield organization.model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def bounding_box(
+    min_latitude: float,
+    min_longitude: float,
+    max_latitude: float,
+    max_longitude: float,
+) -> BoundingBox:
+    try:
+        return BoundingBox(
+            min_latitude=min_latitude,
+            min_longitude=min_longitude,
+            max_latitude=max_latitude,
+            max_longitude=max_longitude,
+        )
+    except ValidationError as e:
+        raise RequestValidationError(
+            [
+                {**error, "loc": ("query", *error["loc"])}
+                for error in e.errors(include_url=False, include_context=False)
+            ]
+        ) from e
+
 
 @organization_router.get(
     "/name",
@@ -38,35 +132,59 @@ async def get_organization_by_name(
 @organization_router.get(
     "/address",
     response_model=list[Organization],
-    responses=get_organizations_by_address_responses,
+    responses={**get_organizations_by_address_responses, **ndjson_stream_responses},
     description="endpoint for getting organizations by address",
 )
-@inject
 async def get_organizations_by_address(
     city: str,
     street: str,
     house_num: str,
-    organizations_from_adress_service: FromDishka[
-        GetOrganizationsFromAddressServiceProtocol
-    ],
-) -> list[Organization]:
-    return await organizations_from_adress_service(city, street, house_num)
+    request: Request,
+    response: Response,
+    limit: PageLimit = all_settings.pagination.default_limit,
+    cursor: PageCursor = None,
+) -> list[Organization] | StreamingResponse:
+    if accepts_ndjson(request):
+        stream_organizations_from_adress_service: (
+            StreamOrganizationsFromAddressServiceProtocol
+        ) = await resolve(request, StreamOrganizationsFromAddressServiceProtocol)
+        return ndjson_response(
+            await stream_organizations_from_adress_service(city, street, house_num)
+        )
+    organizations_from_adress_service: GetOrganizationsFromAddressServiceProtocol = (
+        await resolve(request, GetOrganizationsFromAddressServiceProtocol)
+    )
+    page = await organizations_from_adress_service(
+        city, street, house_num, limit, cursor
+    )
+    return page_items(response, page)
 
 
 @organization_router.get(
     "/activity",
     response_model=list[Organization],
-    responses=get_organizations_by_activity_responses,
+    responses={**get_organizations_by_activity_responses, **ndjson_stream_responses},
     description="endpoint for getting organizations by activity",
 )
-@inject
 async def get_organizations_by_activity(
     activity: str,
-    organizations_from_activity_service: FromDishka[
-        GetOrganizationsFromActivityServiceProtocol
-    ],
-) -> list[Organization]:
-    return await organizations_from_activity_service(activity)
+    request: Request,
+    response: Response,
+    limit: PageLimit = all_settings.pagination.default_limit,
+    cursor: PageCursor = None,
+) -> list[Organization] | StreamingResponse:
+    if accepts_ndjson(request):
+        stream_organizations_from_activity_service: (
+            StreamOrganizationsFromActivityServiceProtocol
+        ) = await resolve(request, StreamOrganizationsFromActivityServiceProtocol)
+        return ndjson_response(
+            await stream_organizations_from_activity_service(activity)
+        )
+    organizations_from_activity_service: GetOrganizationsFromActivityServiceProtocol = (
+        await resolve(request, GetOrganizationsFromActivityServiceProtocol)
+    )
+    page = await organizations_from_activity_service(activity, limit, cursor)
+    return page_items(response, page)
 
 
 @organization_router.get(
@@ -86,30 +204,144 @@ async def get_organization_by_id(
 @organization_router.get(
     "/ancestor/activity",
     response_model=list[Organization],
-    responses=get_organizations_by_activity_responses,
+    responses={**get_organizations_by_activity_responses, **ndjson_stream_responses},
     description="endpoint for getting organizations by ancestor activity",
 )
-@inject
 async def get_organizations_by_ancestor_activity(
     activity: str,
-    organizations_from_ancestor_activity_service: FromDishka[
+    request: Request,
+    response: Response,
+    limit: PageLimit = all_settings.pagination.default_limit,
+    cursor: PageCursor = None,
+) -> list[Organization] | StreamingResponse:
+    if accepts_ndjson(request):
+        stream_organizations_from_ancestor_activity_service: (
+            StreamOrganizationsFromAncestorActivityServiceProtocol
+        ) = await resolve(
+            request, StreamOrganizationsFromAncestorActivityServiceProtocol
+        )
+        return ndjson_response(
+            await stream_organizations_from_ancestor_activity_service(activity)
+        )
+    organizations_from_ancestor_activity_service: (
         GetOrganizationsFromAncestorActivityServiceProtocol
-    ],
-) -> list[Organization]:
-    return await organizations_from_ancestor_activity_service(activity)
+    ) = await resolve(request, GetOrganizationsFromAncestorActivityServiceProtocol)
+    page = await organizations_from_ancestor_activity_service(activity, limit, cursor)
+    return page_items(response, page)
 
 
 @organization_router.get(
     "/location",
     response_model=list[Organization],
-    responses=get_organization_by_id_geo_responses,
+    responses={**get_organizations_by_geo_responses, **ndjson_stream_responses},
     description="endpoint for getting organizations by geo location",
 )
-@inject
 async def get_organizations_by_geo_location(
     latitute: float,
     longitude: float,
     radius: float,
-    organizations_from_geo_service: FromDishka[GetOrganizationsFromGeoServiceProtocol],
-) -> list[Organization]:
-    return await organizations_from_geo_service(latitute, longitude, radius)
+    request: Request,
+    response: Response,
+    limit: PageLimit = all_settings.pagination.default_limit,
+    cursor: PageCursor = None,
+) -> list[Organization] | StreamingResponse:
+    if accepts_ndjson(request):
+        stream_organizations_from_geo_service: (
+            StreamOrganizationsFromGeoServiceProtocol
+        ) = await resolve(request, StreamOrganizationsFromGeoServiceProtocol)
+        return ndjson_response(
+            await stream_organizations_from_geo_service(latitute, longitude, radius)
+        )
+    organizations_from_geo_service: GetOrganizationsFromGeoServiceProtocol = (
+        await resolve(request, GetOrganizationsFromGeoServiceProtocol)
+    )
+    page = await organizations_from_geo_service(
+        latitute, longitude, radius, limit, cursor
+    )
+    return page_items(response, page)
+
+
+@organization_router.get(
+    "/nearest",
+    response_model=list[OrganizationWithDistance],
+    responses=get_nearest_organizations_responses,
+    description="endpoint for getting the k organizations nearest to a point, "
+    "ordered by distance in meters",
+)
+@inject
+async def get_nearest_organizations(
+    latitude: float,
+    longitude: float,
+    nearest_organizations_service: FromDishka[GetNearestOrganizationsServiceProtocol],
+    k: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=all_settings.pagination.max_limit,
+            description="number of organizations to return",
+        ),
+    ] = 20,
+) -> list[OrganizationWithDistance]:
+    return await nearest_organizations_service(latitude, longitude, k)
+
+
+@organization_router.get(
+    "/bbox",
+    response_model=OrganizationsInBox,
+    responses=get_organizations_in_box_responses,
+    description="endpoint for getting organizations inside a map viewport; "
+    "with cluster enabled, a viewport holding more than limit organizations "
+    "is returned as per grid cell counts instead",
+)
+@inject
+async def get_organizations_in_box(
+    bbox: Annotated[BoundingBox, Depends(bounding_box)],
+    organizations_in_box_service: FromDishka[GetOrganizationsInBoxServiceProtocol],
+    limit: PageLimit = all_settings.pagination.default_limit,
+    cluster: Annotated[
+        bool, Query(description="group organizations into grid cells")
+    ] = False,
+    grid_size: Annotated[
+        int, Query(ge=1, le=32, description="number of grid cells per side")
+    ] = 8,
+) -> OrganizationsInBox:
+    return await organizations_in_box_service(bbox, limit, cluster, grid_size)
+
+
+@organization_router.get(
+    "/search",
+    response_model=list[OrganizationWithRank],
+    responses=search_organizations_responses,
+    description="endpoint for full-text and fuzzy search of organizations by name, "
+    "ordered by relevance",
+)
+@inject
+async def search_organizations(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    search_organizations_service: FromDishka[SearchOrganizationsServiceProtocol],
+    limit: Annotated[
+        int,
+        Query(
+            ge=1,
+            le=all_settings.pagination.max_limit,
+            description="number of organizations to return",
+        ),
+    ] = all_settings.search.default_limit,
+) -> list[OrganizationWithRank]:
+    return await search_organizations_service(q, limit)
+
+
+@organization_router.post(
+    "/batch",
+    response_model=list[OrganizationBatchItem],
+    responses=get_organizations_batch_responses,
+    description="endpoint for getting many organizations by ids and names at once; "
+    "results follow the order of ids and then names in the request, "
+    "and the whole batch is charged as a single request",
+)
+@inject
+async def get_organizations_batch(
+    batch: OrganizationBatchRequest,
+    organizations_batch_service: FromDishka[GetOrganizationsBatchServiceProtocol],
+) -> list[OrganizationBatchItem]:
+    return await organizations_batch_service(batch)
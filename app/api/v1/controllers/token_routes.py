@@ -18,7 +18,8 @@ token_router = APIRouter()
     "/issue",
     response_model=str,
     responses=issue_token_responses,
-    description="endpoint for issuing a new token",
+    description="endpoint for issuing a new token; "
+    "the token is only returned here, it is stored as a digest",
 )
 @inject
 async def issue_token(
@@ -32,7 +33,9 @@ async def issue_token(
     "/tokens",
     response_model=list[ApiKey],
     responses=get_all_tokens_responses,
-    description="endpoint for getting all user tokens",
+    description="endpoint for getting all user tokens; "
+    "only the token_prefix of each token is returned, it replaces the former "
+    "token field",
 )
 @inject
 async def get_all_tokens(
@@ -0,0 +1,13 @@
+from .activity_index import ActivityIndex, ActivityTree
+from .response_cache import LRUResponseCacheBackend, ResponseCache
+from .token_cache import TokenCache, TokenQuota, TokenUsage
+
+__all__ = [
+    "ActivityIndex",
+    "ActivityTree",
+    "LRUResponseCacheBackend",
+    "ResponseCache",
+    "TokenCache",
+    "TokenQuota",
+    "TokenUsage",
+]
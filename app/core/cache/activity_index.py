@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class ActivityTree:
+    """Immutable snapshot of the activity tree.
+
+    Built from one row per activity with the ids of all of its ancestors, the
+    activity itself included, as stored in the activity closure table.
+    """
+
+    ids: dict[str, uuid.UUID] = field(default_factory=dict)
+    names: dict[uuid.UUID, str] = field(default_factory=dict)
+    descendants: dict[uuid.UUID, frozenset[uuid.UUID]] = field(default_factory=dict)
+    depths: dict[uuid.UUID, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "ActivityTree":
+        ids = {row["name"]: row["id"] for row in rows}
+        names = {row["id"]: row["name"] for row in rows}
+        descendants: dict[uuid.UUID, set[uuid.UUID]] = {
+            row["id"]: {row["id"]} for row in rows
+        }
+        depths = {}
+        for row in rows:
+            ancestor_ids = set(row["ancestor_ids"]) - {row["id"]}
+            depths[row["id"]] = len(ancestor_ids)
+            for ancestor_id in ancestor_ids:
+                descendants.setdefault(ancestor_id, {ancestor_id}).add(row["id"])
+        return cls(
+            ids=ids,
+            names=names,
+            descendants={
+                activity_id: frozenset(descendant_ids)
+                for activity_id, descendant_ids in descendants.items()
+            },
+            depths=depths,
+        )
+
+    def get_id(self, name: str) -> uuid.UUID | None:
+        return self.ids.get(name)
+
+    def get_depth(self, name: str) -> int | None:
+        activity_id = self.ids.get(name)
+        return self.depths.get(activity_id) if activity_id is not None else None
+
+    def get_descendant_names(self, name: str) -> list[str] | None:
+        """Returns the names of the activity and all of its descendants."""
+        activity_id = self.ids.get(name)
+        if activity_id is None:
+            return None
+        return sorted(
+            self.names[descendant_id]
+            for descendant_id in self.descendants[activity_id]
+            if descendant_id in self.names
+        )
+
+
+class ActivityIndex:
+    """Application-wide in-memory index of the activity tree.
+
+    The tree is loaded at startup by `warm_activity_index` and kept until the
+    version is bumped with `invalidate`. A caller that finds no current tree,
+    because warming failed or has not caught up with an invalidation yet,
+    loads it itself. Concurrent callers share a single load.
+    """
+
+    def __init__(self) -> None:
+        self._tree: ActivityTree | None = None
+        self._version = 0
+        self._loaded_version = -1
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        self._version += 1
+
+    async def get_tree(
+        self, loader: Callable[[], Awaitable[list[dict]]]
+    ) -> ActivityTree:
+        if self._tree is not None and self._loaded_version == self._version:
+            return self._tree
+
+        async with self._lock:
+            if self._tree is None or self._loaded_version != self._version:
+                version = self._version
+                self._tree = ActivityTree.from_rows(await loader())
+                self._loaded_version = version
+            return self._tree
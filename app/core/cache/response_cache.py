@@ -0,0 +1,114 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import Any, TypeVar
+
+from pydantic import TypeAdapter
+
+from app.core.schemas.cache_protocols import ResponseCacheBackendProtocol
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LRUResponseCacheBackend:
+    """In-process response cache backend with LRU eviction and per-entry TTL."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class ResponseCache:
+    """Caches service responses keyed on a namespace and normalized parameters.
+
+    Responses are stored as JSON produced by a pydantic `TypeAdapter`, so the
+    same entries can be kept in-process or in a shared backend. Errors raised
+    by the wrapped call are not cached, and a failing backend only degrades
+    to calling the service directly.
+    """
+
+    def __init__(
+        self, backend: ResponseCacheBackendProtocol, ttl: float, enabled: bool = True
+    ) -> None:
+        self._backend = backend
+        self._ttl = ttl
+        self._enabled = enabled
+
+    @staticmethod
+    def make_key(
+        namespace: str, args: Sequence[Any], kwargs: Mapping[str, Any] | None = None
+    ) -> str:
+        params = json.dumps(
+            [list(args), dict(sorted((kwargs or {}).items()))],
+            default=str,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return f"{namespace}:{params}"
+
+    async def get_or_set(
+        self,
+        key: str,
+        type_adapter: TypeAdapter[T],
+        factory: Callable[[], Awaitable[T]],
+    ) -> T:
+        if not self._enabled:
+            return await factory()
+
+        try:
+            cached = await self._backend.get(key)
+        except Exception:
+            logger.exception("Response cache backend failed to get entry")
+            cached = None
+        if cached is not None:
+            return type_adapter.validate_json(cached)
+
+        response = await factory()
+        try:
+            await self._backend.set(key, type_adapter.dump_json(response), self._ttl)
+        except Exception:
+            logger.exception("Response cache backend failed to set entry")
+        return response
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """Drops cached responses of the given namespaces, or all of them.
+
+        This is the entry point for write paths: anything that changes
+        organizations, buildings, activities or phones should call it.
+        """
+        if not namespaces:
+            await self._backend.clear()
+            return
+        for namespace in namespaces:
+            await self._backend.delete_prefix(f"{namespace}:")
@@ -0,0 +1,172 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from app.core.rate_limit import RateLimit, RateLimitResult
+
+
+@dataclass
+class TokenQuota:
+    limit: int
+    window_start: datetime
+    loaded_at: float
+    rate_limit: RateLimit
+
+    @property
+    def window(self) -> timedelta:
+        return timedelta(seconds=self.rate_limit.window)
+
+    def result(self, allowed: bool) -> RateLimitResult:
+        """Describes the quota after a request was decided on, for the headers."""
+        reset_after = (
+            self.window_start + self.window - datetime.now(timezone.utc)
+        ).total_seconds()
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.rate_limit.rate,
+            remaining=self.limit,
+            reset_after=reset_after,
+            retry_after=reset_after,
+        )
+
+
+@dataclass
+class TokenUsage:
+    used: int = 0
+    window_start: datetime | None = None
+
+
+class TokenCache:
+    """In-memory cache of API token quotas with write-behind usage accounting.
+
+    Cached quotas are evicted in LRU order once `max_size` is reached and are
+    reloaded from the database after `ttl` seconds, which bounds how stale a
+    cached limit can get. Consumed requests are decremented locally and
+    accumulated as pending usage that is drained periodically and written to
+    `ApiTokens.limit` in batches. Each quota carries the rate limit of its
+    token, the window and limit of the cache are only the fallback. Pending
+    usage is kept apart from the LRU entries, so evicting a token never loses
+    requests it has already spent.
+
+    Tokens are keyed by their digest, the raw token is never kept.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        window: timedelta = timedelta(hours=1),
+        window_limit: int = 100,
+    ) -> None:
+        if max_size < 1:
+            # a consumed token has to stay cached until it is counted, the
+            # cache is turned off with TOKEN_CACHE_ENABLED instead
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self._max_size = max_size
+        self._ttl = ttl
+        self._window = window
+        self._window_limit = window_limit
+        self._entries: OrderedDict[bytes, TokenQuota] = OrderedDict()
+        self._pending: dict[bytes, TokenUsage] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token_digest: bytes) -> TokenQuota | None:
+        quota = self._entries.get(token_digest)
+        if quota is None:
+            return None
+        if time.monotonic() - quota.loaded_at > self._ttl:
+            del self._entries[token_digest]
+            return None
+        self._entries.move_to_end(token_digest)
+        return quota
+
+    def put(
+        self,
+        token_digest: bytes,
+        limit: int,
+        last_update: datetime | None,
+        rate_limit: RateLimit | None = None,
+    ) -> TokenQuota:
+        """Caches a quota loaded from the database.
+
+        Without a `rate_limit` the token gets the window and limit of the cache.
+
+        Usage that has not been flushed yet is applied on top of the loaded
+        values, so a reload never hands out requests that were already spent.
+        """
+        if rate_limit is None:
+            rate_limit = RateLimit(
+                rate=self._window_limit,
+                window=self._window.total_seconds(),
+                burst=self._window_limit,
+            )
+        window = timedelta(seconds=rate_limit.window)
+
+        if last_update is None:
+            window_start = datetime.now(timezone.utc) - 2 * window
+        elif last_update.tzinfo is None:
+            window_start = last_update.replace(tzinfo=timezone.utc)
+        else:
+            window_start = last_update
+
+        pending = self._pending.get(token_digest)
+        if pending is not None:
+            if pending.window_start is not None:
+                limit = rate_limit.rate
+                window_start = pending.window_start
+            limit -= pending.used
+
+        quota = TokenQuota(
+            limit=limit,
+            window_start=window_start,
+            loaded_at=time.monotonic(),
+            rate_limit=rate_limit,
+        )
+        self._entries[token_digest] = quota
+        self._entries.move_to_end(token_digest)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return quota
+
+    def consume(self, token_digest: bytes) -> bool:
+        """Spends one request from a cached quota.
+
+        Returns False when the quota of the current window is exhausted. The
+        token must have been loaded with `put` beforehand.
+        """
+        quota = self._entries[token_digest]
+        current_time = datetime.now(timezone.utc)
+
+        if current_time - quota.window_start > quota.window:
+            quota.limit = quota.rate_limit.rate - 1
+            quota.window_start = current_time
+            self._pending[token_digest] = TokenUsage(used=1, window_start=current_time)
+            return True
+
+        if quota.limit <= 0:
+            return False
+
+        quota.limit -= 1
+        self._pending.setdefault(token_digest, TokenUsage()).used += 1
+        return True
+
+    def invalidate(self, token_digest: bytes) -> None:
+        self._entries.pop(token_digest, None)
+
+    def drain(self) -> dict[bytes, TokenUsage]:
+        """Takes all pending usage for writing it to the database."""
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, usage: dict[bytes, TokenUsage]) -> None:
+        """Puts back usage drained by a flush that failed to be written."""
+        for token_digest, drained in usage.items():
+            current = self._pending.get(token_digest)
+            if current is None:
+                self._pending[token_digest] = drained
+            elif current.window_start is None:
+                current.used += drained.used
+                current.window_start = drained.window_start
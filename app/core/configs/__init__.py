@@ -1,6 +1,8 @@
+from app.core.metrics import metrics_registry
+
 from .database import DatabaseConnection
 from .settings import Settings
 
 all_settings = Settings()
 
-db_connection = DatabaseConnection(all_settings)
+db_connection = DatabaseConnection(all_settings, metrics_registry)
@@ -1,27 +1,113 @@
+import asyncio
+import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import NewType
 
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.metrics import (
+    InstrumentedPool,
+    MetricsRegistry,
+    QueryProfiler,
+    instrument_pool,
+    instrument_queries,
+)
 
 from .settings import Settings
 
+logger = logging.getLogger(__name__)
+
+ReadSession = NewType("ReadSession", AsyncSession)
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    session_factory: async_sessionmaker[AsyncSession]
+    healthy: bool = True
+
 
 class DatabaseConnection:
-    def __init__(self, settings: Settings):
-        self.async_engine = create_async_engine(
-            settings.database.db_uri,
+    def __init__(self, settings: Settings, metrics: MetricsRegistry | None = None):
+        self._settings = settings
+        self._metrics = metrics
+        profiling = settings.profiling
+        self._profiler = QueryProfiler(
+            slowest_statements=profiling.slowest_statements if profiling.enabled else 0,
+            slow_query_threshold=profiling.slow_query_threshold / 1000,
+            explain=profiling.explain,
+        )
+        self.async_engine = self._create_engine(settings.database.db_uri, "primary")
+        self.async_session_factory = self._create_session_factory(self.async_engine)
+        self.read_session_factory = self._create_read_session_factory(self.async_engine)
+        self.replicas = [
+            Replica(engine, self._create_read_session_factory(engine))
+            for engine in (
+                self._create_engine(uri, f"replica{index}")
+                for index, uri in enumerate(settings.database.list_of_replica_uris)
+            )
+        ]
+        self._health_check_timeout = settings.database.replica_health_check_timeout
+        self._next_replica = 0
+
+    def _create_engine(self, uri: str, name: str) -> AsyncEngine:
+        database = self._settings.database
+        engine = create_async_engine(
+            uri,
             echo=False,
-            pool_size=settings.database.pool_size,
-            max_overflow=settings.database.max_overflow,
+            poolclass=InstrumentedPool,
+            pool_size=database.pool_size,
+            max_overflow=database.max_overflow,
+            pool_timeout=database.pool_timeout,
+            pool_recycle=database.pool_recycle,
+            pool_pre_ping=database.pool_pre_ping,
+            connect_args=database.connect_args,
         )
-        self.async_session_factory = async_sessionmaker(
-            bind=self.async_engine,
+        if self._metrics is not None:
+            instrument_pool(engine, self._metrics, name)
+            instrument_queries(engine, self._metrics, name)
+        self._profiler.instrument(engine, name)
+        return engine
+
+    @staticmethod
+    def _create_session_factory(
+        engine: AsyncEngine,
+    ) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            bind=engine,
             autocommit=False,
             autoflush=False,
             expire_on_commit=False,
         )
 
+    @classmethod
+    def _create_read_session_factory(
+        cls, engine: AsyncEngine
+    ) -> async_sessionmaker[AsyncSession]:
+        # the option engine shares the pool of `engine` and switches its
+        # connections to autocommit only while they are checked out
+        return cls._create_session_factory(
+            engine.execution_options(isolation_level="AUTOCOMMIT")
+        )
+
+    def _get_read_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Picks the next healthy replica round-robin, or the primary if none is."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next_replica % len(self.replicas)]
+            self._next_replica += 1
+            if replica.healthy:
+                return replica.session_factory
+        return self.read_session_factory
+
     @asynccontextmanager
     async def get_session(self) -> AsyncIterator[AsyncSession]:
         async with self.async_session_factory() as session:
@@ -31,3 +117,46 @@ class DatabaseConnection:
             except SQLAlchemyError as err:
                 await session.rollback()
                 raise err
+
+    @asynccontextmanager
+    async def get_read_session(self) -> AsyncIterator[AsyncSession]:
+        """Opens an autocommit session for reads, on a replica when there is one.
+
+        Every statement runs in its own implicit transaction, so there is no
+        BEGIN or COMMIT round trip and the session works behind poolers in
+        transaction mode. Reads that need a transaction open one explicitly.
+        """
+        async with self._get_read_session_factory()() as session:
+            yield session
+
+    async def _check_replica(self, replica: Replica) -> bool:
+        try:
+            async with asyncio.timeout(self._health_check_timeout):
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except (SQLAlchemyError, OSError, TimeoutError):
+            return False
+        return True
+
+    async def check_replicas(self) -> None:
+        """Takes unreachable replicas out of the rotation and returns recovered ones."""
+        results = await asyncio.gather(
+            *(self._check_replica(replica) for replica in self.replicas)
+        )
+        for replica, healthy in zip(self.replicas, results):
+            if replica.healthy != healthy:
+                logger.warning(
+                    "Replica %s is %s",
+                    replica.engine.url.render_as_string(hide_password=True),
+                    "healthy again" if healthy else "unhealthy",
+                )
+            replica.healthy = healthy
+
+
+async def run_replica_health_checks(
+    db_connection: DatabaseConnection, interval: float
+) -> None:
+    """Checks the replicas on startup and then every `interval` seconds."""
+    while True:
+        await db_connection.check_replicas()
+        await asyncio.sleep(interval)
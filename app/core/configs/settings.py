@@ -1,5 +1,6 @@
 from os import environ as env
 from pathlib import Path
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -35,11 +36,42 @@ class DatabaseSettings(BaseModel):
     db_name: str = Field(default="my_database", alias="POSTGRES_DB")
     pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
     max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    pool_recycle: int = Field(default=-1, alias="DB_POOL_RECYCLE")
+    pool_pre_ping: bool = Field(default=False, alias="DB_POOL_PRE_PING")
+    statement_timeout: int = Field(default=0, alias="DB_STATEMENT_TIMEOUT_MS")
+    prepare_threshold: int = Field(default=-1, alias="DB_PREPARE_THRESHOLD")
+    replica_uris: str = Field(default="", alias="POSTGRES_REPLICA_URIS")
+    replica_health_check_interval: float = Field(
+        default=5.0, alias="DB_REPLICA_HEALTH_CHECK_INTERVAL"
+    )
+    replica_health_check_timeout: float = Field(
+        default=2.0, alias="DB_REPLICA_HEALTH_CHECK_TIMEOUT"
+    )
+
+    @property
+    def connect_args(self) -> dict:
+        # psycopg prepares a statement server-side once it has run that many
+        # times on a connection, a negative threshold turns preparing off.
+        # Prepared statements belong to one server connection and break behind
+        # a pooler in transaction mode (pgbouncer), so it is off by default and
+        # meant for deployments that connect to PostgreSQL directly
+        prepare_threshold = (
+            self.prepare_threshold if self.prepare_threshold >= 0 else None
+        )
+        connect_args: dict = {"prepare_threshold": prepare_threshold}
+        if self.statement_timeout > 0:
+            connect_args["options"] = f"-c statement_timeout={self.statement_timeout}"
+        return connect_args
 
     @property
     def db_uri(self) -> str:
         return f"postgresql+psycopg://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}"
 
+    @property
+    def list_of_replica_uris(self) -> list[str]:
+        return [uri.strip() for uri in self.replica_uris.split(",") if uri.strip()]
+
 
 class LoggingSettings(BaseModel):
     log_level: str = Field(default="DEBUG", alias="LOG_LEVEL")
@@ -48,6 +80,61 @@ class LoggingSettings(BaseModel):
         default="utf-8",
         alias="LOG_ENCODING",
     )
+    queue_size: int = Field(default=10000, alias="LOG_QUEUE_SIZE")
+    queue_full_policy: Literal["drop_new", "drop_oldest"] = Field(
+        default="drop_new", alias="LOG_QUEUE_FULL_POLICY"
+    )
+    batch_size: int = Field(default=100, alias="LOG_BATCH_SIZE")
+    success_sample_rate: float = Field(default=1.0, alias="LOG_SUCCESS_SAMPLE_RATE")
+
+
+class ProfilingSettings(BaseModel):
+    enabled: bool = Field(default=False, alias="QUERY_PROFILING_ENABLED")
+    slowest_statements: int = Field(
+        default=3, alias="QUERY_PROFILING_SLOWEST_STATEMENTS"
+    )
+    slow_query_threshold: int = Field(default=500, alias="SLOW_QUERY_THRESHOLD_MS")
+    explain: bool = Field(default=False, alias="SLOW_QUERY_EXPLAIN")
+
+
+class PaginationSettings(BaseModel):
+    default_limit: int = Field(default=50, alias="PAGE_DEFAULT_LIMIT")
+    max_limit: int = Field(default=100, alias="PAGE_MAX_LIMIT")
+
+
+class SearchSettings(BaseModel):
+    default_limit: int = Field(default=10, alias="SEARCH_DEFAULT_LIMIT")
+    statement_timeout: int = Field(default=200, alias="SEARCH_STATEMENT_TIMEOUT_MS")
+
+
+class BatchSettings(BaseModel):
+    max_size: int = Field(default=500, alias="BATCH_MAX_SIZE")
+
+
+class ReadModelSettings(BaseModel):
+    refresh_interval: float = Field(
+        default=30.0, alias="ORGANIZATION_DOCUMENTS_REFRESH_INTERVAL"
+    )
+
+
+class TokenCacheSettings(BaseModel):
+    enabled: bool = Field(default=False, alias="TOKEN_CACHE_ENABLED")
+    max_size: int = Field(default=10000, ge=1, alias="TOKEN_CACHE_MAX_SIZE")
+    ttl: float = Field(default=30.0, alias="TOKEN_CACHE_TTL")
+    flush_interval: float = Field(default=5.0, alias="TOKEN_CACHE_FLUSH_INTERVAL")
+
+
+class RateLimitSettings(BaseModel):
+    algorithm: Literal["fixed_window", "token_bucket", "sliding_window_log"] = Field(
+        default="fixed_window", alias="RATE_LIMIT_ALGORITHM"
+    )
+    max_keys: int = Field(default=100000, alias="RATE_LIMIT_MAX_KEYS")
+
+
+class ResponseCacheSettings(BaseModel):
+    enabled: bool = Field(default=True, alias="RESPONSE_CACHE_ENABLED")
+    max_size: int = Field(default=1024, alias="RESPONSE_CACHE_MAX_SIZE")
+    ttl: float = Field(default=60.0, alias="RESPONSE_CACHE_TTL")
 
 
 class OtherSettings(BaseModel):
@@ -64,4 +151,24 @@ class Settings(BaseModel):
     api: APISettings = Field(default_factory=lambda: APISettings(**env))
     database: DatabaseSettings = Field(default_factory=lambda: DatabaseSettings(**env))
     logging: LoggingSettings = Field(default_factory=lambda: LoggingSettings(**env))
+    profiling: ProfilingSettings = Field(
+        default_factory=lambda: ProfilingSettings(**env)
+    )
+    pagination: PaginationSettings = Field(
+        default_factory=lambda: PaginationSettings(**env)
+    )
+    search: SearchSettings = Field(default_factory=lambda: SearchSettings(**env))
+    batch: BatchSettings = Field(default_factory=lambda: BatchSettings(**env))
+    read_model: ReadModelSettings = Field(
+        default_factory=lambda: ReadModelSettings(**env)
+    )
+    token_cache: TokenCacheSettings = Field(
+        default_factory=lambda: TokenCacheSettings(**env)
+    )
+    rate_limit: RateLimitSettings = Field(
+        default_factory=lambda: RateLimitSettings(**env)
+    )
+    response_cache: ResponseCacheSettings = Field(
+        default_factory=lambda: ResponseCacheSettings(**env)
+    )
     different: OtherSettings = Field(default_factory=lambda: OtherSettings(**env))
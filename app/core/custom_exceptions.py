@@ -24,3 +24,15 @@ class TheLimitExceededError(Exception):
 
 class ActivityNotFoundError(Exception):
     pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class SearchTimeoutError(Exception):
+    pass
+
+
+class BatchTooLargeError(Exception):
+    pass
@@ -0,0 +1,30 @@
+from .pool_metrics import InstrumentedPool, PoolMetrics, instrument_pool
+from .query_metrics import (
+    QueryStats,
+    StatementTiming,
+    current_query_stats,
+    instrument_queries,
+    track_queries,
+)
+from .query_profiler import QueryProfiler
+from .registry import CONTENT_TYPE, Counter, Gauge, Histogram, MetricsRegistry
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "InstrumentedPool",
+    "MetricsRegistry",
+    "PoolMetrics",
+    "QueryProfiler",
+    "QueryStats",
+    "StatementTiming",
+    "current_query_stats",
+    "instrument_pool",
+    "instrument_queries",
+    "metrics_registry",
+    "track_queries",
+]
+
+metrics_registry = MetricsRegistry()
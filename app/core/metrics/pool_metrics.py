@@ -0,0 +1,132 @@
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection, QueuePool
+
+from .registry import MetricsRegistry
+
+CHECKOUT_WAIT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class PoolMetrics:
+    """Connection pool metrics of one engine, labelled with the pool name."""
+
+    def __init__(self, registry: MetricsRegistry, name: str) -> None:
+        self.name = name
+        self.size = registry.gauge(
+            "db_pool_size", "Connections kept open by the pool", ["pool"]
+        )
+        self.checked_out = registry.gauge(
+            "db_pool_checked_out_connections",
+            "Connections currently checked out of the pool",
+            ["pool"],
+        )
+        self.overflow = registry.gauge(
+            "db_pool_overflow_connections",
+            "Connections open beyond the pool size",
+            ["pool"],
+        )
+        self.checkouts = registry.counter(
+            "db_pool_checkouts_total", "Connections checked out of the pool", ["pool"]
+        )
+        self.connects = registry.counter(
+            "db_pool_connects_total", "New database connections opened", ["pool"]
+        )
+        self.invalidations = registry.counter(
+            "db_pool_invalidations_total", "Connections invalidated", ["pool"]
+        )
+        self.checkout_timeouts = registry.counter(
+            "db_pool_checkout_timeouts_total",
+            "Checkouts that gave up after the pool timeout",
+            ["pool"],
+        )
+        self.checkout_wait = registry.histogram(
+            "db_pool_checkout_wait_seconds",
+            "Time to get a connection from the pool, opening new ones included",
+            ["pool"],
+            buckets=CHECKOUT_WAIT_BUCKETS,
+        )
+
+    def on_checkout(self, *args: Any) -> None:
+        self.checkouts.inc(pool=self.name)
+        self.checked_out.inc(pool=self.name)
+
+    def on_checkin(self, *args: Any) -> None:
+        self.checked_out.dec(pool=self.name)
+
+    def on_connect(self, *args: Any) -> None:
+        self.connects.inc(pool=self.name)
+
+    def on_invalidate(self, *args: Any) -> None:
+        self.invalidations.inc(pool=self.name)
+
+    def collect(self, pool: QueuePool) -> None:
+        self.size.set(pool.size(), pool=self.name)
+        self.overflow.set(max(pool.overflow(), 0), pool=self.name)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Async queue pool that times its checkouts and counts their timeouts.
+
+    Everything else is reported through the regular pool events.
+    """
+
+    metrics: PoolMetrics | None = None
+
+    def connect(self) -> PoolProxiedConnection:
+        if self.metrics is None:
+            return super().connect()
+
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.checkout_timeouts.inc(pool=self.metrics.name)
+            raise
+        finally:
+            self.metrics.checkout_wait.observe(
+                time.perf_counter() - start, pool=self.metrics.name
+            )
+
+    def recreate(self) -> QueuePool:
+        pool = super().recreate()
+        if isinstance(pool, InstrumentedPool):
+            pool.metrics = self.metrics
+        return pool
+
+
+def instrument_pool(engine: AsyncEngine, registry: MetricsRegistry, name: str) -> None:
+    """Reports the pool of `engine`, created with `InstrumentedPool`, to `registry`."""
+    pool = engine.sync_engine.pool
+    metrics = PoolMetrics(registry, name)
+    if isinstance(pool, InstrumentedPool):
+        pool.metrics = metrics
+
+    # listeners are carried over when the pool is recreated
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+    event.listen(pool, "connect", metrics.on_connect)
+    event.listen(pool, "invalidate", metrics.on_invalidate)
+
+    def collect() -> None:
+        current_pool = engine.sync_engine.pool
+        if isinstance(current_pool, QueuePool):
+            metrics.collect(current_pool)
+
+    registry.add_collector(collect)
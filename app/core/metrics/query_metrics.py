@@ -0,0 +1,101 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .registry import MetricsRegistry
+
+QUERY_DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+@dataclass(order=True)
+class StatementTiming:
+    duration: float
+    statement: str
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    slowest: list[StatementTiming] = field(default_factory=list)
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Adds up the queries run in the current context, a request for instance.
+
+    The stats are shared with the tasks and greenlets the context is copied to,
+    so queries run by the async engine are counted as well. Inside a context
+    that is already tracked the enclosing stats are yielded, so every
+    middleware of a request sees the same numbers.
+    """
+    stats = _query_stats.get()
+    if stats is not None:
+        yield stats
+        return
+
+    stats = QueryStats()
+    reset_token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(reset_token)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _query_stats.get()
+
+
+def instrument_queries(
+    engine: AsyncEngine, registry: MetricsRegistry, name: str
+) -> None:
+    """Counts and times the statements `engine` runs, labelled with `name`."""
+    queries = registry.counter(
+        "db_queries_total", "Statements sent to the database", ["pool"]
+    )
+    durations = registry.histogram(
+        "db_query_duration_seconds",
+        "Time the database took to run a statement",
+        ["pool"],
+        buckets=QUERY_DURATION_BUCKETS,
+    )
+
+    def before_cursor_execute(*args: Any) -> None:
+        context = args[4]
+        context._query_start = time.perf_counter()
+
+    def after_cursor_execute(*args: Any) -> None:
+        context = args[4]
+        duration = time.perf_counter() - context._query_start
+        queries.inc(pool=name)
+        durations.observe(duration, pool=name)
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += duration
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
@@ -0,0 +1,129 @@
+import asyncio
+import contextvars
+import heapq
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .query_metrics import StatementTiming, current_query_stats
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.slow_queries")
+
+MAX_STATEMENT_LENGTH = 500
+
+_explaining: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "explaining", default=False
+)
+
+
+class QueryProfiler:
+    """Profiles the statements of instrumented engines.
+
+    With `slowest_statements` above zero the slowest statements of every
+    tracked request are kept in its `QueryStats`, for the request log.
+    Statements taking longer than `slow_query_threshold` seconds are written
+    to the `app.slow_queries` logger, a threshold of 0 turns the log off.
+
+    With `explain` a slow SELECT is run once more under `EXPLAIN ANALYZE` on a
+    connection of its own, in a background task, so the request is not held up
+    and its transaction is left alone. One plan is captured at a time and slow
+    queries arriving meanwhile are logged without one.
+    """
+
+    def __init__(
+        self,
+        slowest_statements: int = 0,
+        slow_query_threshold: float = 0.0,
+        explain: bool = False,
+    ) -> None:
+        self._slowest_statements = slowest_statements
+        self._slow_query_threshold = slow_query_threshold
+        self._explain = explain
+        self._explain_task: asyncio.Task | None = None
+
+    def instrument(self, engine: AsyncEngine, name: str) -> None:
+        if self._slowest_statements <= 0 and self._slow_query_threshold <= 0:
+            return
+
+        def before_cursor_execute(*args: Any) -> None:
+            context = args[4]
+            context._profile_start = time.perf_counter()
+
+        def after_cursor_execute(*args: Any) -> None:
+            statement, parameters, context, executemany = args[2:6]
+            if _explaining.get():
+                return
+            duration = time.perf_counter() - context._profile_start
+            self._record(statement, duration)
+            if 0 < self._slow_query_threshold <= duration:
+                self._log_slow_query(engine, name, statement, parameters, duration)
+                if self._explain and not executemany:
+                    self._start_explain(engine, name, statement, parameters)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+    def _record(self, statement: str, duration: float) -> None:
+        stats = current_query_stats()
+        if stats is None or self._slowest_statements <= 0:
+            return
+
+        timing = StatementTiming(duration, statement[:MAX_STATEMENT_LENGTH])
+        # a min-heap on the duration, so the fastest of the kept ones goes first
+        if len(stats.slowest) < self._slowest_statements:
+            heapq.heappush(stats.slowest, timing)
+        elif duration > stats.slowest[0].duration:
+            heapq.heapreplace(stats.slowest, timing)
+
+    @staticmethod
+    def _log_slow_query(
+        engine: AsyncEngine, name: str, statement: str, parameters: Any, duration: float
+    ) -> None:
+        slow_query_logger.warning(
+            "Slow query",
+            extra={
+                "pool": name,
+                "database": engine.url.database,
+                "statement": statement,
+                "duration_ms": round(duration * 1000, 3),
+            },
+        )
+
+    def _start_explain(
+        self, engine: AsyncEngine, name: str, statement: str, parameters: Any
+    ) -> None:
+        if statement.lstrip()[:6].upper() != "SELECT":
+            return
+        if self._explain_task is not None and not self._explain_task.done():
+            return
+
+        # a fresh context keeps the plan query out of the request's stats
+        self._explain_task = asyncio.get_running_loop().create_task(
+            self._log_plan(engine, name, statement, parameters),
+            context=contextvars.Context(),
+        )
+
+    @staticmethod
+    async def _log_plan(
+        engine: AsyncEngine, name: str, statement: str, parameters: Any
+    ) -> None:
+        _explaining.set(True)
+        try:
+            async with engine.connect() as connection:
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters
+                )
+                plan = "\n".join(row[0] for row in result)
+        except SQLAlchemyError:
+            logger.exception("Could not capture the plan of a slow query")
+            return
+
+        slow_query_logger.warning(
+            "Slow query plan",
+            extra={"pool": name, "statement": statement, "plan": plan},
+        )
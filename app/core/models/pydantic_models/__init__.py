@@ -1,9 +1,26 @@
 from .adress_pydantic_models import Address
-from .organization_pydantic_models import Organization
+from .geo_pydantic_models import BoundingBox, GridCluster
+from .organization_pydantic_models import (
+    Organization,
+    OrganizationBatchItem,
+    OrganizationBatchRequest,
+    OrganizationPage,
+    OrganizationsInBox,
+    OrganizationWithDistance,
+    OrganizationWithRank,
+)
 from .token_pydantic_models import ApiKey
 
 __all__ = [
     "Address",
     "ApiKey",
     "Organization",
+    "OrganizationPage",
+    "OrganizationWithDistance",
+    "BoundingBox",
+    "GridCluster",
+    "OrganizationsInBox",
+    "OrganizationWithRank",
+    "OrganizationBatchRequest",
+    "OrganizationBatchItem",
 ]
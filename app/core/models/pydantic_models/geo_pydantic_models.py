@@ -0,0 +1,24 @@
+from typing import Self
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class BoundingBox(BaseModel):
+    min_latitude: float = Field(ge=-90, le=90)
+    min_longitude: float = Field(ge=-180, le=180)
+    max_latitude: float = Field(ge=-90, le=90)
+    max_longitude: float = Field(ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_corners(self) -> Self:
+        if self.min_latitude > self.max_latitude:
+            raise ValueError("min_latitude must not be greater than max_latitude")
+        if self.min_longitude > self.max_longitude:
+            raise ValueError("min_longitude must not be greater than max_longitude")
+        return self
+
+
+class GridCluster(BaseModel):
+    latitude: float
+    longitude: float
+    count: int
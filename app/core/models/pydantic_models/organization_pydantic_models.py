@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import UUID4, BaseModel, ConfigDict, Field
 
 from .adress_pydantic_models import Address
+from .geo_pydantic_models import GridCluster
 
 
 class Organization(BaseModel):
@@ -10,3 +11,33 @@ class Organization(BaseModel):
     phones_numbers: list[str]
     address: Address
     activities: list[str]
+
+
+class OrganizationWithDistance(Organization):
+    distance: float
+
+
+class OrganizationWithRank(Organization):
+    rank: float
+
+
+class OrganizationPage(BaseModel):
+    items: list[Organization]
+    next_cursor: str | None = None
+
+
+class OrganizationsInBox(BaseModel):
+    total: int
+    organizations: list[Organization]
+    clusters: list[GridCluster]
+
+
+class OrganizationBatchRequest(BaseModel):
+    ids: list[UUID4] = Field(default_factory=list)
+    names: list[str] = Field(default_factory=list)
+
+
+class OrganizationBatchItem(BaseModel):
+    query: str
+    found: bool
+    organization: Organization | None = None
@@ -1,8 +1,18 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ApiKey(BaseModel):
+    """An issued API token as listed by GET /api_token/tokens.
+
+    Only the SHA-256 digest of a token is stored, the token itself is returned
+    once by POST /api_token/issue. `token_prefix` replaces the former `token`
+    field and is kept for display only: tokens are looked up by their digest,
+    so the prefix must never be indexed or queried.
+    """
+
     model_config = ConfigDict(from_attributes=True)
 
-    token: str
+    token_prefix: str = Field(
+        description="first characters of the token, for telling tokens apart"
+    )
     limit: int
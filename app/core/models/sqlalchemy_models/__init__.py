@@ -2,6 +2,7 @@ from .activities_sql_model import Activities, ActivityClosure
 from .base_sql_model import Base
 from .buildings_sql_model import Buildings
 from .organization_activities_sql_model import OrganizationActivities
+from .organization_documents_sql_model import OrganizationDocuments
 from .organization_phones_sql_model import OrganizationPhones
 from .organizations_sql_model import Organizations
 from .phones_sql_model import Phones
@@ -13,6 +14,7 @@ __all__ = [
     "ActivityClosure",
     "Buildings",
     "OrganizationActivities",
+    "OrganizationDocuments",
     "OrganizationPhones",
     "Organizations",
     "Phones",
@@ -0,0 +1,28 @@
+from geoalchemy2 import Geography
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_sql_model import Base
+
+
+class OrganizationDocuments(Base):
+    """Read model of organizations, a materialized view over the normalized tables.
+
+    The view is created and indexed by migrations and is excluded from
+    autogenerate through `info["is_view"]`.
+    """
+
+    __table_args__ = {"info": {"is_view": True}}
+
+    name: Mapped[str] = mapped_column(nullable=False)
+    address: Mapped[str | None] = mapped_column()
+    office: Mapped[int | None] = mapped_column()
+    location: Mapped[Geography | None] = mapped_column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False)
+    )
+    phones: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+    activities: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<OrganizationDocuments(name={self.name}, address={self.address})>"
@@ -1,7 +1,7 @@
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -17,6 +17,23 @@ if TYPE_CHECKING:
 
 
 class Organizations(Base):
+    __table_args__ = (
+        Index(
+            "idx_organizations_name_tsvector",
+            text(
+                "(to_tsvector('russian'::regconfig, name) "
+                "|| to_tsvector('english'::regconfig, name))"
+            ),
+            postgresql_using="gin",
+        ),
+        Index(
+            "idx_organizations_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
     building_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("buildings.id"), nullable=False
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import CheckConstraint, ForeignKey, LargeBinary, String, func
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -16,10 +16,32 @@ if TYPE_CHECKING:
 
 
 class ApiTokens(Base):
+    __table_args__ = (
+        CheckConstraint("rate_limit > 0", name="api_tokens_rate_limit_check"),
+        CheckConstraint("rate_window > 0", name="api_tokens_rate_window_check"),
+        CheckConstraint("burst >= 1", name="api_tokens_burst_check"),
+    )
+
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
-    token: Mapped[str] = mapped_column(unique=True, nullable=False)
+    # the SHA-256 digest of the token, which is never stored itself
+    token_digest: Mapped[bytes] = mapped_column(
+        LargeBinary(32), unique=True, nullable=False
+    )
+    # the first characters of the token, for display only: tokens are looked
+    # up by their digest, so the prefix is not indexed and must not be queried
+    token_prefix: Mapped[str] = mapped_column(String(8), nullable=False)
     limit: Mapped[int] = mapped_column(default=100, nullable=False)
     last_update: Mapped[datetime] = mapped_column(default=func.now())
+    # requests allowed per `rate_window` seconds, and up to `burst` at once
+    rate_limit: Mapped[int] = mapped_column(
+        default=100, server_default="100", nullable=False
+    )
+    rate_window: Mapped[int] = mapped_column(
+        default=3600, server_default="3600", nullable=False
+    )
+    burst: Mapped[int] = mapped_column(
+        default=100, server_default="100", nullable=False
+    )
 
     user: Mapped["Users"] = relationship(
         "Users",
@@ -27,4 +49,4 @@ class ApiTokens(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<ApiTokens(token={self.token}, limit={self.limit}, last_update={self.last_update})>"
+        return f"<ApiTokens(token_prefix={self.token_prefix}, limit={self.limit}, last_update={self.last_update})>"
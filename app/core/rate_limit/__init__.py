@@ -0,0 +1,21 @@
+from .algorithms import ALGORITHMS, RateLimitAlgorithm, SlidingWindowLog, TokenBucket
+from .backends import InMemoryRateLimitBackend, RateLimitBackend
+from .limits import (
+    RATE_LIMIT_HEADERS,
+    RateLimit,
+    RateLimitResult,
+    rate_limit_headers,
+)
+
+__all__ = [
+    "ALGORITHMS",
+    "InMemoryRateLimitBackend",
+    "RATE_LIMIT_HEADERS",
+    "RateLimit",
+    "RateLimitAlgorithm",
+    "RateLimitBackend",
+    "RateLimitResult",
+    "SlidingWindowLog",
+    "TokenBucket",
+    "rate_limit_headers",
+]
@@ -0,0 +1,84 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from .limits import RateLimit, RateLimitResult
+
+
+class RateLimitAlgorithm(Protocol):
+    """Decides on a request from the state kept for its key.
+
+    `hit` gets the state returned by its previous call for the same key, or
+    None for a key it has not seen, and returns the state to keep.
+    """
+
+    def hit(
+        self, state: Any, limit: RateLimit, now: float
+    ) -> tuple[Any, RateLimitResult]:
+        pass
+
+
+@dataclass
+class BucketState:
+    tokens: float
+    updated_at: float
+
+
+class TokenBucket:
+    """Refills `rate` requests per `window` seconds into a bucket of `burst`."""
+
+    def hit(
+        self, state: BucketState | None, limit: RateLimit, now: float
+    ) -> tuple[BucketState, RateLimitResult]:
+        refill_rate = limit.rate / limit.window
+        if state is None:
+            tokens = float(limit.burst)
+        else:
+            elapsed = max(now - state.updated_at, 0.0)
+            tokens = min(float(limit.burst), state.tokens + elapsed * refill_rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        result = RateLimitResult(
+            allowed=allowed,
+            limit=limit.burst,
+            remaining=int(tokens),
+            reset_after=(limit.burst - tokens) / refill_rate,
+            retry_after=0.0 if allowed else (1 - tokens) / refill_rate,
+        )
+        return BucketState(tokens, now), result
+
+
+class SlidingWindowLog:
+    """Allows `rate` requests in any `window` seconds, keeping their timestamps."""
+
+    def hit(
+        self, state: deque[float] | None, limit: RateLimit, now: float
+    ) -> tuple[deque[float], RateLimitResult]:
+        log = state if state is not None else deque()
+        while log and log[0] <= now - limit.window:
+            log.popleft()
+
+        allowed = len(log) < limit.rate
+        if allowed:
+            log.append(now)
+
+        oldest_expires_after = log[0] + limit.window - now if log else 0.0
+        result = RateLimitResult(
+            allowed=allowed,
+            limit=limit.rate,
+            remaining=limit.rate - len(log),
+            reset_after=log[-1] + limit.window - now if log else 0.0,
+            retry_after=0.0 if allowed else oldest_expires_after,
+        )
+        return log, result
+
+
+# fixed_window keeps the hourly quota in the database and needs no limiter
+ALGORITHMS: dict[str, type[RateLimitAlgorithm] | None] = {
+    "fixed_window": None,
+    "token_bucket": TokenBucket,
+    "sliding_window_log": SlidingWindowLog,
+}
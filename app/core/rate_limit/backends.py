@@ -0,0 +1,52 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, Protocol
+
+from .algorithms import RateLimitAlgorithm
+from .limits import RateLimit, RateLimitResult
+
+
+class RateLimitBackend(Protocol):
+    """Store of the rate limit counters.
+
+    A backend counts a request of `key` against `limit` and decides on it as a
+    single step. A backend on a shared store has to do it atomically in the
+    store, with a server-side script or a compare-and-set loop, so that the
+    instances of the application sharing it never over-admit.
+    """
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        pass
+
+
+class InMemoryRateLimitBackend:
+    """Keeps the state of an algorithm per key in process.
+
+    Nothing is awaited between reading and writing the state of a key, so the
+    decisions of one event loop are atomic. Keys are evicted in LRU order once
+    `max_keys` is reached, and an evicted key starts over with its full limit.
+    """
+
+    def __init__(
+        self,
+        algorithm: RateLimitAlgorithm,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._algorithm = algorithm
+        self._max_keys = max_keys
+        self._clock = clock
+        self._states: OrderedDict[str, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        state, result = self._algorithm.hit(
+            self._states.pop(key, None), limit, self._clock()
+        )
+        self._states[key] = state
+        while len(self._states) > self._max_keys:
+            self._states.popitem(last=False)
+        return result
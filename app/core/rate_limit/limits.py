@@ -0,0 +1,52 @@
+import math
+from dataclasses import dataclass
+
+RATE_LIMIT_HEADERS = [
+    "X-RateLimit-Limit",
+    "X-RateLimit-Remaining",
+    "X-RateLimit-Reset",
+    "Retry-After",
+]
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """The rate limit of a token.
+
+    `rate` requests are allowed per `window` seconds. The token bucket holds up
+    to `burst` requests, so that many can be spent at once after a quiet period.
+    """
+
+    rate: int
+    window: float
+    burst: int
+
+    def __post_init__(self) -> None:
+        if self.rate <= 0:
+            raise ValueError(f"rate must be positive, got {self.rate}")
+        if self.window <= 0:
+            raise ValueError(f"window must be positive, got {self.window}")
+        if self.burst < 1:
+            raise ValueError(f"burst must be at least 1, got {self.burst}")
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    # seconds until the whole limit is available again
+    reset_after: float
+    # seconds until a refused request would be allowed
+    retry_after: float = 0.0
+
+
+def rate_limit_headers(result: RateLimitResult) -> dict[str, str]:
+    headers = {
+        "X-RateLimit-Limit": str(result.limit),
+        "X-RateLimit-Remaining": str(max(result.remaining, 0)),
+        "X-RateLimit-Reset": str(math.ceil(max(result.reset_after, 0))),
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(math.ceil(max(result.retry_after, 0)))
+    return headers
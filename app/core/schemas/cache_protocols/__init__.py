@@ -0,0 +1,3 @@
+from .response_cache_protocols import ResponseCacheBackendProtocol
+
+__all__ = ["ResponseCacheBackendProtocol"]
@@ -0,0 +1,15 @@
+from typing import Protocol
+
+
+class ResponseCacheBackendProtocol(Protocol):
+    async def get(self, key: str) -> bytes | None:
+        pass
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    async def delete_prefix(self, prefix: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
@@ -1,40 +1,108 @@
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 from pydantic import UUID4
 
+from app.core.models.pydantic_models import BoundingBox
+
 
 class OrganizationRepoProtocol(Protocol):
-    async def check_activity_exists(self, activity: str) -> bool:
+    async def get_organization_by_id(self, org_id: UUID4) -> str | None:
         pass
 
-    async def get_all_organizations_from_activity(self, activity: str) -> list[str]:
+    async def get_organization_full_info(self, org_id: UUID4) -> dict | None:
         pass
 
-    async def get_organization_by_id(self, org_id: UUID4) -> str | None:
+    async def get_organization_full_info_by_name(self, org_name: str) -> dict | None:
         pass
 
-    async def get_organizations_within_radius(
-        self, latitude: float, longitude: float, radius: float
-    ) -> list[str]:
+    async def get_organizations_full_info_by_names(
+        self, org_names: list[str]
+    ) -> list[dict]:
         pass
 
-    async def get_organization_full_info(self, org_id: UUID4) -> dict | None:
+    async def get_organizations_full_info_by_ids_and_names(
+        self, org_ids: list[UUID4], org_names: list[str]
+    ) -> list[dict]:
         pass
 
-    async def get_organizations_full_info_by_names(
-        self, org_names: list[str]
+    async def get_activity_tree(self) -> list[dict]:
+        pass
+
+    async def get_organizations_full_info_by_activities(
+        self,
+        activities: list[str],
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> list[dict]:
+        pass
+
+    async def get_activity_with_organizations_full_info(
+        self,
+        activity: str,
+        include_descendants: bool = False,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> tuple[bool, list[dict]]:
+        pass
+
+    async def get_organizations_full_info_within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
     ) -> list[dict]:
         pass
 
-    async def get_organizations_by_address_parts(
+    async def get_organizations_full_info_by_address_parts(
+        self,
+        city: str,
+        street: str,
+        house_num: str,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> list[dict]:
+        pass
+
+    def stream_organizations_full_info_by_activities(
+        self, activities: list[str]
+    ) -> AsyncIterator[dict]:
+        pass
+
+    def stream_organizations_full_info_within_radius(
+        self, latitude: float, longitude: float, radius: float
+    ) -> AsyncIterator[dict]:
+        pass
+
+    def stream_organizations_full_info_by_address_parts(
         self, city: str, street: str, house_num: str
-    ) -> list[str]:
+    ) -> AsyncIterator[dict]:
         pass
 
-    async def get_organizations_by_ancestor_activity_optimized(
-        self, ancestor_name: str
-    ) -> list[str]:
+    async def get_nearest_organizations_full_info(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[dict]:
         pass
 
-    async def get_organization_full_info_by_name(self, org_name: str) -> dict | None:
+    async def count_organizations_in_bbox(self, bbox: BoundingBox) -> int:
+        pass
+
+    async def get_organizations_full_info_in_bbox(
+        self, bbox: BoundingBox, limit: int | None = None
+    ) -> list[dict]:
+        pass
+
+    async def get_organization_clusters_in_bbox(
+        self, bbox: BoundingBox, grid_size: int
+    ) -> list[dict]:
+        pass
+
+    async def search_organizations_full_info(
+        self, query: str, limit: int, statement_timeout: int
+    ) -> list[dict]:
+        pass
+
+    async def refresh_organization_documents(self) -> bool:
         pass
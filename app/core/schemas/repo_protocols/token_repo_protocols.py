@@ -29,14 +29,19 @@ class TokenRepoProtocol(Protocol):
         pass
 
     async def get_token_info_for_validation(
-        self, token: str
-    ) -> Optional[tuple[int, datetime]]:
+        self, token_digest: bytes
+    ) -> Optional[tuple[int, datetime, int, int, int]]:
         pass
 
-    async def decrease_token_limit(self, token: str) -> None:
+    async def consume_token_limit(
+        self, token_digest: bytes
+    ) -> Optional[tuple[bool, int, int, float]]:
         pass
 
-    async def reset_token_limit_and_decrease(
-        self, token: str, limit: int = 100
+    async def decrease_token_limits(self, usage: dict[bytes, int]) -> None:
+        pass
+
+    async def reset_token_limits_and_decrease(
+        self, usage: dict[bytes, tuple[int, datetime]]
     ) -> None:
         pass
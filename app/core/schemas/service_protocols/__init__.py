@@ -1,10 +1,18 @@
 from .organization_service_protocols import (
+    GetNearestOrganizationsServiceProtocol,
     GetOrganizationByIDServiceProtocol,
     GetOrganizationByNameServiceProtocol,
+    GetOrganizationsBatchServiceProtocol,
     GetOrganizationsFromActivityServiceProtocol,
     GetOrganizationsFromAddressServiceProtocol,
     GetOrganizationsFromAncestorActivityServiceProtocol,
     GetOrganizationsFromGeoServiceProtocol,
+    GetOrganizationsInBoxServiceProtocol,
+    SearchOrganizationsServiceProtocol,
+    StreamOrganizationsFromActivityServiceProtocol,
+    StreamOrganizationsFromAddressServiceProtocol,
+    StreamOrganizationsFromAncestorActivityServiceProtocol,
+    StreamOrganizationsFromGeoServiceProtocol,
 )
 from .token_service_protocols import (
     GetApiTokensServiceProtocol,
@@ -20,4 +28,12 @@ __all__ = [
     "GetOrganizationByIDServiceProtocol",
     "GetOrganizationsFromAncestorActivityServiceProtocol",
     "GetOrganizationsFromGeoServiceProtocol",
+    "GetNearestOrganizationsServiceProtocol",
+    "GetOrganizationsInBoxServiceProtocol",
+    "SearchOrganizationsServiceProtocol",
+    "GetOrganizationsBatchServiceProtocol",
+    "StreamOrganizationsFromAddressServiceProtocol",
+    "StreamOrganizationsFromActivityServiceProtocol",
+    "StreamOrganizationsFromAncestorActivityServiceProtocol",
+    "StreamOrganizationsFromGeoServiceProtocol",
 ]
@@ -1,8 +1,18 @@
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 from pydantic import UUID4
 
-from app.core.models.pydantic_models import Organization
+from app.core.models.pydantic_models import (
+    BoundingBox,
+    Organization,
+    OrganizationBatchItem,
+    OrganizationBatchRequest,
+    OrganizationPage,
+    OrganizationsInBox,
+    OrganizationWithDistance,
+    OrganizationWithRank,
+)
 
 
 class GetOrganizationByNameServiceProtocol(Protocol):
@@ -12,13 +22,20 @@ class GetOrganizationByNameServiceProtocol(Protocol):
 
 class GetOrganizationsFromAddressServiceProtocol(Protocol):
     async def __call__(
-        self, city: str, street: str, house_num: str
-    ) -> list[Organization]:
+        self,
+        city: str,
+        street: str,
+        house_num: str,
+        limit: int,
+        cursor: str | None = None,
+    ) -> OrganizationPage:
         pass
 
 
 class GetOrganizationsFromActivityServiceProtocol(Protocol):
-    async def __call__(self, activity: str) -> list[Organization]:
+    async def __call__(
+        self, activity: str, limit: int, cursor: str | None = None
+    ) -> OrganizationPage:
         pass
 
 
@@ -28,12 +45,69 @@ class GetOrganizationByIDServiceProtocol(Protocol):
 
 
 class GetOrganizationsFromAncestorActivityServiceProtocol(Protocol):
-    async def __call__(self, activity: str) -> list[Organization]:
+    async def __call__(
+        self, activity: str, limit: int, cursor: str | None = None
+    ) -> OrganizationPage:
         pass
 
 
 class GetOrganizationsFromGeoServiceProtocol(Protocol):
+    async def __call__(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        limit: int,
+        cursor: str | None = None,
+    ) -> OrganizationPage:
+        pass
+
+
+class GetNearestOrganizationsServiceProtocol(Protocol):
+    async def __call__(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[OrganizationWithDistance]:
+        pass
+
+
+class GetOrganizationsInBoxServiceProtocol(Protocol):
+    async def __call__(
+        self, bbox: BoundingBox, limit: int, cluster: bool, grid_size: int
+    ) -> OrganizationsInBox:
+        pass
+
+
+class SearchOrganizationsServiceProtocol(Protocol):
+    async def __call__(self, query: str, limit: int) -> list[OrganizationWithRank]:
+        pass
+
+
+class GetOrganizationsBatchServiceProtocol(Protocol):
+    async def __call__(
+        self, batch: OrganizationBatchRequest
+    ) -> list[OrganizationBatchItem]:
+        pass
+
+
+class StreamOrganizationsFromAddressServiceProtocol(Protocol):
+    async def __call__(
+        self, city: str, street: str, house_num: str
+    ) -> AsyncIterator[Organization]:
+        pass
+
+
+class StreamOrganizationsFromActivityServiceProtocol(Protocol):
+    async def __call__(self, activity: str) -> AsyncIterator[Organization]:
+        pass
+
+
+class StreamOrganizationsFromAncestorActivityServiceProtocol(Protocol):
+    async def __call__(self, activity: str) -> AsyncIterator[Organization]:
+        pass
+
+
+class StreamOrganizationsFromGeoServiceProtocol(Protocol):
     async def __call__(
         self, latitude: float, longitude: float, radius: float
-    ) -> list[Organization]:
+    ) -> AsyncIterator[Organization]:
         pass
@@ -1,7 +1,14 @@
+from .api_tokens import TOKEN_PREFIX_LENGTH, get_token_prefix, hash_token
 from .logger import init_logger
+from .pagination import decode_cursor, encode_cursor
 from .snakecase import to_snake_case
 
 __all__ = [
+    "TOKEN_PREFIX_LENGTH",
+    "decode_cursor",
+    "encode_cursor",
+    "get_token_prefix",
+    "hash_token",
     "init_logger",
     "to_snake_case",
 ]
@@ -0,0 +1,13 @@
+import hashlib
+
+TOKEN_PREFIX_LENGTH = 8
+
+
+def hash_token(token: str) -> bytes:
+    # tokens carry 256 random bits, so a fast unsalted hash is enough to keep
+    # them from being usable if the table leaks
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get_token_prefix(token: str) -> str:
+    return token[:TOKEN_PREFIX_LENGTH]
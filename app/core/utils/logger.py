@@ -1,5 +1,11 @@
+import atexit
+import copy
 import logging
+import queue
+import random
 import sys
+import threading
+from logging.handlers import QueueHandler
 
 from pythonjsonlogger import jsonlogger
 
@@ -7,6 +13,167 @@ from app.core.configs.settings import LoggingSettings
 
 logger = logging.getLogger(__name__)
 
+_STOP = None
+
+_exception_formatter = logging.Formatter()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queue handler that never lets a full queue go unnoticed.
+
+    With the `drop_new` policy a record that does not fit is dropped, and with
+    `drop_oldest` the oldest queued record makes room for it. The handler never
+    waits for room, since logging calls are made from the event loop. Dropped
+    records are counted and reported by the listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop_new") -> None:
+        super().__init__(log_queue)
+        self.log_queue = log_queue
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Copies the record for the listener thread.
+
+        Unlike `QueueHandler.prepare` the message and its arguments are left as
+        they are, so the JSON formatter of the listener sees the original
+        record. Only the traceback is formatted here, into `exc_text`, so the
+        frames it references are not kept alive in the queue.
+        """
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.log_queue.put_nowait(record)
+        except queue.Full:
+            if self.policy == "drop_oldest":
+                try:
+                    self.log_queue.get_nowait()
+                    self.log_queue.put_nowait(record)
+                except (queue.Empty, queue.Full):
+                    pass
+            self.dropped += 1
+
+
+class SuccessSampler(logging.Filter):
+    """Keeps only a `rate` share of the records of successful (2xx) requests."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        status_code = getattr(record, "response_status", None)
+        if not isinstance(status_code, int) or not 200 <= status_code <= 299:
+            return True
+        return random.random() < self.rate
+
+
+class BatchingQueueListener:
+    """Writes queued records to the handlers from a background thread.
+
+    The listener takes every record that is already waiting, up to `batch_size`,
+    and writes them to each stream handler in a single write and flush, so a
+    burst of requests costs a few system calls instead of one per line.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        queue_handler: BoundedQueueHandler,
+        handlers: list[logging.Handler],
+        batch_size: int,
+    ) -> None:
+        self.queue = log_queue
+        self.queue_handler = queue_handler
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self._reported_dropped = 0
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._monitor, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Writes out the queued records and stops the thread."""
+        if self._thread is None:
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _monitor(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            self.handle([record for record in batch if record is not _STOP])
+            if stop:
+                return
+
+    def handle(self, records: list[logging.LogRecord]) -> None:
+        dropped = self.queue_handler.dropped
+        if dropped > self._reported_dropped:
+            records.append(
+                logger.makeRecord(
+                    logger.name,
+                    logging.WARNING,
+                    __file__,
+                    0,
+                    "%d log records were dropped because the log queue was full",
+                    (dropped - self._reported_dropped,),
+                    None,
+                )
+            )
+            self._reported_dropped = dropped
+
+        for handler in self.handlers:
+            handler_records = [
+                record for record in records if record.levelno >= handler.level
+            ]
+            if not handler_records:
+                continue
+            if isinstance(handler, logging.StreamHandler):
+                self._write(handler, handler_records)
+            else:
+                for record in handler_records:
+                    handler.handle(record)
+
+    @staticmethod
+    def _write(
+        handler: logging.StreamHandler, records: list[logging.LogRecord]
+    ) -> None:
+        lines = []
+        for record in records:
+            if handler.filter(record):
+                try:
+                    lines.append(handler.format(record) + handler.terminator)
+                except Exception:
+                    handler.handleError(record)
+        if not lines:
+            return
+
+        handler.acquire()
+        try:
+            handler.stream.write("".join(lines))
+            handler.flush()
+        except Exception:
+            handler.handleError(records[-1])
+        finally:
+            handler.release()
+
 
 def init_logger(log_settings: LoggingSettings) -> None:
     """Initializes the logger with specified settings.
@@ -15,11 +182,22 @@ def init_logger(log_settings: LoggingSettings) -> None:
     and to a specified log file, with a custom JSON format. The log level, file path,
     and encoding are set according to the provided `log_settings`.
 
+    Logging calls only put the record on a bounded queue; formatting and the
+    blocking writes to stdout and the file happen in batches on a background
+    thread, so logging adds no disk I/O to the event loop. What happens when
+    the queue is full is set by `log_settings.queue_full_policy`, and only a
+    `log_settings.success_sample_rate` share of 2xx request records is kept.
+
     Args:
         log_settings (LoggingSettings): Configuration settings for the logger,
                                          including log level, log file path,
                                          and log encoding.
     """
+    root = logging.getLogger()
+    if root.handlers:
+        # already configured, like `logging.basicConfig` does
+        return
+
     log_level = log_settings.log_level.upper()
     log_file = log_settings.log_file
     log_encoding = log_settings.log_encoding
@@ -30,4 +208,18 @@ def init_logger(log_settings: LoggingSettings) -> None:
     file_handler = logging.FileHandler(log_file, encoding=log_encoding)
     stream_handler.setFormatter(formatter)
     file_handler.setFormatter(formatter)
-    logging.basicConfig(level=log_level, handlers=[stream_handler, file_handler])
+
+    log_queue: queue.Queue = queue.Queue(maxsize=log_settings.queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, log_settings.queue_full_policy)
+    if log_settings.success_sample_rate < 1:
+        queue_handler.addFilter(SuccessSampler(log_settings.success_sample_rate))
+
+    listener = BatchingQueueListener(
+        log_queue,
+        queue_handler,
+        [stream_handler, file_handler],
+        log_settings.batch_size,
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    logging.basicConfig(level=log_level, handlers=[queue_handler])
@@ -0,0 +1,16 @@
+import binascii
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from app.core.custom_exceptions import InvalidCursorError
+
+
+def encode_cursor(last_id: uuid.UUID) -> str:
+    return urlsafe_b64encode(last_id.bytes).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(bytes=urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise InvalidCursorError
@@ -1,8 +1,10 @@
 from dishka import make_async_container
 
 from app.dependencies.providers import (
+    CacheProviders,
     ConfigsProvider,
     DatabaseConnectionProvider,
+    MetricsProvider,
     RepoProviders,
     ServiceProviders,
 )
@@ -12,4 +14,6 @@ container = make_async_container(
     ConfigsProvider(),
     ServiceProviders(),
     RepoProviders(),
+    CacheProviders(),
+    MetricsProvider(),
 )
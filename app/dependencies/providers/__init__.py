@@ -1,10 +1,14 @@
+from .cache_providers import CacheProviders
 from .con_providers import DatabaseConnectionProvider
+from .metrics_providers import MetricsProvider
 from .repo_providers import RepoProviders
 from .service_provider import ServiceProviders
 from .settings_providers import ConfigsProvider
 
 __all__ = [
+    "CacheProviders",
     "DatabaseConnectionProvider",
+    "MetricsProvider",
     "RepoProviders",
     "ServiceProviders",
     "ConfigsProvider",
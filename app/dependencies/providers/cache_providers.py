@@ -0,0 +1,19 @@
+from dishka import Provider, Scope, provide
+
+from app.core.cache import ActivityIndex, LRUResponseCacheBackend, ResponseCache
+from app.core.configs.settings import Settings
+
+
+class CacheProviders(Provider):
+    @provide(scope=Scope.APP)
+    async def get_response_cache(self, settings: Settings) -> ResponseCache:
+        cache_settings = settings.response_cache
+        return ResponseCache(
+            LRUResponseCacheBackend(cache_settings.max_size),
+            ttl=cache_settings.ttl,
+            enabled=cache_settings.enabled,
+        )
+
+    @provide(scope=Scope.APP)
+    async def get_activity_index(self) -> ActivityIndex:
+        return ActivityIndex()
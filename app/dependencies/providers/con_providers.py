@@ -3,14 +3,16 @@ from collections.abc import AsyncIterator
 from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.configs.database import DatabaseConnection
-from app.core.configs.settings import Settings
+from app.core.configs import db_connection
+from app.core.configs.database import DatabaseConnection, ReadSession
 
 
 class DatabaseConnectionProvider(Provider):
     @provide(scope=Scope.APP)
-    async def get_database(self, settings: Settings) -> DatabaseConnection:
-        return DatabaseConnection(settings)
+    async def get_database(self) -> DatabaseConnection:
+        # the middlewares and background tasks use the module-level connection
+        # too, so there is one set of pools and one set of pool metrics
+        return db_connection
 
     @provide(scope=Scope.REQUEST)
     async def get_db_session(
@@ -18,3 +20,10 @@ class DatabaseConnectionProvider(Provider):
     ) -> AsyncIterator[AsyncSession]:
         async with database.get_session() as session:
             yield session
+
+    @provide(scope=Scope.REQUEST)
+    async def get_read_db_session(
+        self, database: DatabaseConnection
+    ) -> AsyncIterator[ReadSession]:
+        async with database.get_read_session() as session:
+            yield ReadSession(session)
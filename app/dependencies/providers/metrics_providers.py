@@ -0,0 +1,9 @@
+from dishka import Provider, Scope, provide
+
+from app.core.metrics import MetricsRegistry, metrics_registry
+
+
+class MetricsProvider(Provider):
+    @provide(scope=Scope.APP)
+    async def get_metrics_registry(self) -> MetricsRegistry:
+        return metrics_registry
@@ -1,6 +1,7 @@
 from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.configs.database import ReadSession
 from app.core.schemas.repo_protocols import OrganizationRepoProtocol, TokenRepoProtocol
 from app.repositories import OrganizationRepo, TokenRepo
 
@@ -11,7 +12,5 @@ class RepoProviders(Provider):
         return TokenRepo(con)
 
     @provide(scope=Scope.REQUEST)
-    async def get_organization_repo(
-        self, con: AsyncSession
-    ) -> OrganizationRepoProtocol:
+    async def get_organization_repo(self, con: ReadSession) -> OrganizationRepoProtocol:
         return OrganizationRepo(con)
@@ -1,25 +1,52 @@
 from dishka import Provider, Scope, provide
 
+from app.core.cache import ActivityIndex, ResponseCache
+from app.core.configs.settings import Settings
 from app.core.schemas.repo_protocols import OrganizationRepoProtocol, TokenRepoProtocol
 from app.core.schemas.service_protocols import (
     GetApiTokensServiceProtocol,
+    GetNearestOrganizationsServiceProtocol,
     GetOrganizationByIDServiceProtocol,
     GetOrganizationByNameServiceProtocol,
+    GetOrganizationsBatchServiceProtocol,
     GetOrganizationsFromActivityServiceProtocol,
     GetOrganizationsFromAddressServiceProtocol,
     GetOrganizationsFromAncestorActivityServiceProtocol,
     GetOrganizationsFromGeoServiceProtocol,
+    GetOrganizationsInBoxServiceProtocol,
     IssueApiTokenServiceProtocol,
+    SearchOrganizationsServiceProtocol,
+    StreamOrganizationsFromActivityServiceProtocol,
+    StreamOrganizationsFromAddressServiceProtocol,
+    StreamOrganizationsFromAncestorActivityServiceProtocol,
+    StreamOrganizationsFromGeoServiceProtocol,
 )
 from app.services import (
+    CachedService,
     GetApiTokensService,
+    GetNearestOrganizationsService,
     GetOrganizationByIDService,
     GetOrganizationByNameService,
+    GetOrganizationsBatchService,
     GetOrganizationsFromActivityService,
     GetOrganizationsFromAddressService,
     GetOrganizationsFromAncestorActivityService,
     GetOrganizationsFromGeoService,
+    GetOrganizationsInBoxService,
     IssueApiTokenService,
+    SearchOrganizationsService,
+    StreamOrganizationsFromActivityService,
+    StreamOrganizationsFromAddressService,
+    StreamOrganizationsFromAncestorActivityService,
+    StreamOrganizationsFromGeoService,
+)
+from app.services.cached_service import (
+    ORGANIZATION_BY_ID_NAMESPACE,
+    ORGANIZATION_BY_NAME_NAMESPACE,
+    ORGANIZATIONS_FROM_ACTIVITY_NAMESPACE,
+    ORGANIZATIONS_FROM_ANCESTOR_ACTIVITY_NAMESPACE,
+    organization_adapter,
+    organization_page_adapter,
 )
 
 
@@ -38,9 +65,16 @@ class ServiceProviders(Provider):
 
     @provide(scope=Scope.REQUEST)
     async def get_get_organization_by_name_service(
-        self, organization_repo: OrganizationRepoProtocol
+        self,
+        organization_repo: OrganizationRepoProtocol,
+        response_cache: ResponseCache,
     ) -> GetOrganizationByNameServiceProtocol:
-        return GetOrganizationByNameService(organization_repo)
+        return CachedService(
+            GetOrganizationByNameService(organization_repo),
+            response_cache,
+            ORGANIZATION_BY_NAME_NAMESPACE,
+            organization_adapter,
+        )
 
     @provide(scope=Scope.REQUEST)
     async def get_organizations_from_address_service(
@@ -50,24 +84,101 @@ class ServiceProviders(Provider):
 
     @provide(scope=Scope.REQUEST)
     async def get_organizations_from_activity_service(
-        self, organization_repo: OrganizationRepoProtocol
+        self,
+        organization_repo: OrganizationRepoProtocol,
+        response_cache: ResponseCache,
+        activity_index: ActivityIndex,
     ) -> GetOrganizationsFromActivityServiceProtocol:
-        return GetOrganizationsFromActivityService(organization_repo)
+        return CachedService(
+            GetOrganizationsFromActivityService(organization_repo, activity_index),
+            response_cache,
+            ORGANIZATIONS_FROM_ACTIVITY_NAMESPACE,
+            organization_page_adapter,
+        )
 
     @provide(scope=Scope.REQUEST)
     async def get_organization_by_id_service(
-        self, organization_repo: OrganizationRepoProtocol
+        self,
+        organization_repo: OrganizationRepoProtocol,
+        response_cache: ResponseCache,
     ) -> GetOrganizationByIDServiceProtocol:
-        return GetOrganizationByIDService(organization_repo)
+        return CachedService(
+            GetOrganizationByIDService(organization_repo),
+            response_cache,
+            ORGANIZATION_BY_ID_NAMESPACE,
+            organization_adapter,
+        )
 
     @provide(scope=Scope.REQUEST)
     async def get_organizations_from_ancestor_activity_service(
-        self, organization_repo: OrganizationRepoProtocol
+        self,
+        organization_repo: OrganizationRepoProtocol,
+        response_cache: ResponseCache,
+        activity_index: ActivityIndex,
     ) -> GetOrganizationsFromAncestorActivityServiceProtocol:
-        return GetOrganizationsFromAncestorActivityService(organization_repo)
+        return CachedService(
+            GetOrganizationsFromAncestorActivityService(
+                organization_repo, activity_index
+            ),
+            response_cache,
+            ORGANIZATIONS_FROM_ANCESTOR_ACTIVITY_NAMESPACE,
+            organization_page_adapter,
+        )
 
     @provide(scope=Scope.REQUEST)
     async def get_organizations_from_geo_service(
         self, organization_repo: OrganizationRepoProtocol
     ) -> GetOrganizationsFromGeoServiceProtocol:
         return GetOrganizationsFromGeoService(organization_repo)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_nearest_organizations_service(
+        self, organization_repo: OrganizationRepoProtocol
+    ) -> GetNearestOrganizationsServiceProtocol:
+        return GetNearestOrganizationsService(organization_repo)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_organizations_in_box_service(
+        self, organization_repo: OrganizationRepoProtocol
+    ) -> GetOrganizationsInBoxServiceProtocol:
+        return GetOrganizationsInBoxService(organization_repo)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_search_organizations_service(
+        self, organization_repo: OrganizationRepoProtocol, settings: Settings
+    ) -> SearchOrganizationsServiceProtocol:
+        return SearchOrganizationsService(
+            organization_repo, settings.search.statement_timeout
+        )
+
+    @provide(scope=Scope.REQUEST)
+    async def get_organizations_batch_service(
+        self, organization_repo: OrganizationRepoProtocol, settings: Settings
+    ) -> GetOrganizationsBatchServiceProtocol:
+        return GetOrganizationsBatchService(organization_repo, settings.batch.max_size)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_stream_organizations_from_address_service(
+        self, organization_repo: OrganizationRepoProtocol
+    ) -> StreamOrganizationsFromAddressServiceProtocol:
+        return StreamOrganizationsFromAddressService(organization_repo)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_stream_organizations_from_activity_service(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> StreamOrganizationsFromActivityServiceProtocol:
+        return StreamOrganizationsFromActivityService(organization_repo, activity_index)
+
+    @provide(scope=Scope.REQUEST)
+    async def get_stream_organizations_from_ancestor_activity_service(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> StreamOrganizationsFromAncestorActivityServiceProtocol:
+        return StreamOrganizationsFromAncestorActivityService(
+            organization_repo, activity_index
+        )
+
+    @provide(scope=Scope.REQUEST)
+    async def get_stream_organizations_from_geo_service(
+        self, organization_repo: OrganizationRepoProtocol
+    ) -> StreamOrganizationsFromGeoServiceProtocol:
+        return StreamOrganizationsFromGeoService(organization_repo)
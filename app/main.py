@@ -1,3 +1,6 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
 from logging import getLogger
 
 from dishka.integrations.fastapi import setup_dishka
@@ -6,37 +9,137 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 
 from app.api.exception_responses.exceptions import (
+    activity_not_exists_error,
     address_not_exists_error,
+    batch_too_large_error,
+    invalid_cursor_error,
     many_tokens_error,
     organization_not_exists_error,
+    search_timeout_error,
     user_has_no_tokens_error,
 )
-from app.api.v1.controllers import organization_router, token_router
+from app.api.v1.controllers import metrics_router, organization_router, token_router
+from app.api.v1.controllers.organization_routes import NEXT_CURSOR_HEADER
+from app.core.cache import ActivityIndex, ResponseCache, TokenCache
 from app.core.configs import all_settings, db_connection
+from app.core.configs.database import DatabaseConnection, run_replica_health_checks
 from app.core.custom_exceptions import (
+    ActivityNotFoundError,
     AddressNotFoundError,
     AlreadyManyTokensError,
+    BatchTooLargeError,
+    InvalidCursorError,
     OrganizationNotFoundError,
+    SearchTimeoutError,
     UserHasNoTokensError,
 )
+from app.core.metrics import metrics_registry
+from app.core.rate_limit import (
+    ALGORITHMS,
+    RATE_LIMIT_HEADERS,
+    InMemoryRateLimitBackend,
+)
 from app.core.utils import init_logger
 from app.dependencies.container import container
-from app.middleware.check_token_valid import CheckTokenMiddleware
+from app.middleware.check_token_valid import (
+    CheckTokenMiddleware,
+    run_token_usage_flusher,
+)
 from app.middleware.logger import LoggerMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.services.organization_documents_service import (
+    run_organization_documents_refresher,
+    warm_activity_index,
+)
 
 logger = getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    activity_index = await app.state.dishka_container.get(ActivityIndex)
+    await warm_activity_index(app.state.db_connection, activity_index)
+
+    background_tasks = []
+    if app.state.token_cache is not None:
+        background_tasks.append(
+            asyncio.create_task(
+                run_token_usage_flusher(
+                    app.state.token_cache,
+                    app.state.db_connection,
+                    all_settings.token_cache.flush_interval,
+                )
+            )
+        )
+    if all_settings.read_model.refresh_interval > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_organization_documents_refresher(
+                    app.state.db_connection,
+                    activity_index,
+                    await app.state.dishka_container.get(ResponseCache),
+                    all_settings.read_model.refresh_interval,
+                )
+            )
+        )
+    database: DatabaseConnection = await app.state.dishka_container.get(
+        DatabaseConnection
+    )
+    if database.replicas:
+        background_tasks.append(
+            asyncio.create_task(
+                run_replica_health_checks(
+                    database,
+                    all_settings.database.replica_health_check_interval,
+                )
+            )
+        )
+    yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+def init_token_cache(app: FastAPI) -> None:
+    token_cache_settings = all_settings.token_cache
+    app.state.token_cache = (
+        TokenCache(max_size=token_cache_settings.max_size, ttl=token_cache_settings.ttl)
+        if token_cache_settings.enabled
+        else None
+    )
+
+
+def init_rate_limiter(app: FastAPI) -> None:
+    rate_limit_settings = all_settings.rate_limit
+    if rate_limit_settings.algorithm not in ALGORITHMS:
+        raise ValueError(
+            f"Unknown rate limit algorithm {rate_limit_settings.algorithm!r}, "
+            f"expected one of {', '.join(ALGORITHMS)}"
+        )
+    algorithm = ALGORITHMS[rate_limit_settings.algorithm]
+    app.state.rate_limiter = (
+        InMemoryRateLimitBackend(algorithm(), rate_limit_settings.max_keys)
+        if algorithm is not None
+        else None
+    )
+
+
 def register_exception_handlers(app: FastAPI) -> None:
     app.add_exception_handler(AlreadyManyTokensError, many_tokens_error)  # type: ignore
     app.add_exception_handler(UserHasNoTokensError, user_has_no_tokens_error)  # type: ignore
     app.add_exception_handler(OrganizationNotFoundError, organization_not_exists_error)  # type: ignore
     app.add_exception_handler(AddressNotFoundError, address_not_exists_error)  # type: ignore
+    app.add_exception_handler(ActivityNotFoundError, activity_not_exists_error)  # type: ignore
+    app.add_exception_handler(InvalidCursorError, invalid_cursor_error)  # type: ignore
+    app.add_exception_handler(SearchTimeoutError, search_timeout_error)  # type: ignore
+    app.add_exception_handler(BatchTooLargeError, batch_too_large_error)  # type: ignore
 
 
 def init_routers(app: FastAPI) -> None:
     http_bearer = HTTPBearer(auto_error=True)
     app.include_router(token_router, prefix="/api_token", tags=["api_token"])
+    app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
     app.include_router(
         organization_router,
         prefix="/organization",
@@ -54,9 +157,11 @@ def init_middlewares(app: FastAPI) -> None:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, *RATE_LIMIT_HEADERS],
     )
-    app.add_middleware(LoggerMiddleware)
-    app.add_middleware(CheckTokenMiddleware)
+    app.add_middleware(LoggerMiddleware, profiling=all_settings.profiling.enabled)
+    app.add_middleware(CheckTokenMiddleware, registry=metrics_registry)
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
 
 
 def setup_app() -> FastAPI:
@@ -65,8 +170,11 @@ def setup_app() -> FastAPI:
         description="API for working with data on organizations, buildings, and activities. \
                     Supports location-based search, activity classification, and advanced filtering",
         version="0.1.0",
+        lifespan=lifespan,
     )
     app.state.db_connection = db_connection
+    init_token_cache(app)
+    init_rate_limiter(app)
     init_logger(all_settings.logging)
     setup_dishka(app=app, container=container)
     init_routers(app)
@@ -1,16 +1,79 @@
-from datetime import datetime, timedelta, timezone
-from typing import Any
+import asyncio
+import logging
+from datetime import datetime, timezone
 
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.cache import TokenCache, TokenQuota
+from app.core.configs.database import DatabaseConnection
 from app.core.custom_exceptions import MissingOrBadTokenError, TheLimitExceededError
+from app.core.metrics import MetricsRegistry, metrics_registry
+from app.core.rate_limit import RateLimit, RateLimitResult, rate_limit_headers
+from app.core.utils import hash_token
 from app.repositories.token_repo import TokenRepo
 
+logger = logging.getLogger(__name__)
 
-class CheckTokenMiddleware(BaseHTTPMiddleware):
+
+async def flush_token_usage(
+    token_cache: TokenCache, db_connection: DatabaseConnection
+) -> None:
+    """Writes the usage accumulated in the token cache to the database.
+
+    Tokens whose window was reset locally get their limit and `last_update`
+    rewritten, the rest are decreased by the number of requests spent. If the
+    write fails, the usage is returned to the cache and retried on the next flush.
+    """
+    usage = token_cache.drain()
+    if not usage:
+        return
+
+    decreases = {
+        token_digest: token_usage.used
+        for token_digest, token_usage in usage.items()
+        if token_usage.window_start is None
+    }
+    resets = {
+        token_digest: (
+            token_usage.used,
+            token_usage.window_start.astimezone(timezone.utc).replace(tzinfo=None),
+        )
+        for token_digest, token_usage in usage.items()
+        if token_usage.window_start is not None
+    }
+
+    try:
+        async with db_connection.get_session() as session:
+            token_repo = TokenRepo(session)
+            await token_repo.decrease_token_limits(decreases)
+            await token_repo.reset_token_limits_and_decrease(resets)
+    except Exception:
+        token_cache.restore(usage)
+        raise
+
+
+async def run_token_usage_flusher(
+    token_cache: TokenCache, db_connection: DatabaseConnection, interval: float
+) -> None:
+    """Flushes token usage every `interval` seconds and once more when cancelled."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await flush_token_usage(token_cache, db_connection)
+            except Exception:
+                logger.exception("Failed to flush token usage")
+    finally:
+        try:
+            await flush_token_usage(token_cache, db_connection)
+        except Exception:
+            logger.exception("Failed to flush token usage")
+
+
+class CheckTokenMiddleware:
     """Middleware to check the validity of the token in incoming requests.
 
     This middleware ensures that requests have a valid authorization token in the
@@ -18,60 +81,102 @@ class CheckTokenMiddleware(BaseHTTPMiddleware):
     associated request limit. If the token is invalid or missing, or if the
     request limit is exceeded, an appropriate error response is returned.
 
-    Excluded paths such as '/docs', '/openapi.json' and '/api_token' are
+    Excluded paths such as '/docs', '/openapi.json', '/api_token' and '/metrics' are
     bypassed, meaning the token validation is not applied to these routes.
+
+    By default each request spends one request of the quota with a single
+    atomic UPDATE, so parallel requests, on any number of workers, are never
+    admitted beyond the limit. When the application has a token cache in its
+    state, quotas are checked and decreased in memory instead and the usage is
+    written to the database in batches by `run_token_usage_flusher`, so a
+    cached token costs no queries per request. Every worker counts on its own
+    then, so up to one limit per worker can be admitted in a window. Cache hits
+    and misses are counted in `token_cache_lookups_total`.
+
+    When the application has a rate limiter in its state, requests are decided
+    on by it instead, against the rate, window and burst stored on the token,
+    and the quota in the database is left alone. Either way the state of the
+    limit is sent back in `X-RateLimit-*` headers.
+
+    The middleware is a plain ASGI application: accepted requests are passed to
+    the wrapped app untouched, without the task and body stream wrapping of
+    `BaseHTTPMiddleware`.
     """
 
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
-        self.excluded_paths = ["/docs", "/openapi.json", "/api_token"]
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.excluded_paths = ["/docs", "/openapi.json", "/api_token", "/metrics"]
+        self.token_cache_lookups = registry.counter(
+            "token_cache_lookups_total",
+            "Token quota lookups in the token cache by result",
+            ["result"],
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        error_response = await self.check_request(Request(scope))
+        if error_response is not None:
+            await error_response(scope, receive, send)
+            return
+
+        result = scope.get("state", {}).get("rate_limit")
+        if result is None:
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next: Any) -> Any:
+        headers = rate_limit_headers(result)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def check_request(self, request: Request) -> JSONResponse | None:
+        """Validates the request token and spends one request of its quota.
+
+        Returns:
+            JSONResponse | None: The error response to send instead of calling
+                                 the application, or None if the request is allowed.
+        """
         try:
             if any(
                 request.url.path.startswith(path.rstrip("/"))
                 for path in self.excluded_paths
             ):
-                return await call_next(request)
+                return None
 
             token = request.headers.get("Authorization")
             if not token or not token.startswith("Bearer "):
                 raise MissingOrBadTokenError
-            token = token.split(" ", 1)[1]
+            # the token is hashed once, the cache, the limiter and the
+            # database only ever see its digest
+            token_digest = hash_token(token.split(" ", 1)[1])
 
             # Получаем db_connection из состояния приложения
             db_connection = request.app.state.db_connection
+            token_cache = request.app.state.token_cache
+            rate_limiter = getattr(request.app.state, "rate_limiter", None)
 
-            async with db_connection.get_session() as session:
-                token_repo = TokenRepo(session)
-
-                token_info = await token_repo.get_token_info_for_validation(token)
-                if not token_info:
-                    raise MissingOrBadTokenError
-
-                token_limit, token_last_update = token_info
-                current_time = datetime.now(timezone.utc)
-
-                if token_last_update:
-                    if isinstance(token_last_update, str):
-                        last_update_time = datetime.fromisoformat(
-                            token_last_update
-                        ).replace(tzinfo=timezone.utc)
-                    else:
-                        last_update_time = (
-                            token_last_update.replace(tzinfo=timezone.utc)
-                            if token_last_update.tzinfo is None
-                            else token_last_update
-                        )
-                else:
-                    last_update_time = current_time - timedelta(hours=2)
-
-                if current_time - last_update_time > timedelta(hours=1):
-                    await token_repo.reset_token_limit_and_decrease(token)
-                elif token_limit <= 0:
-                    raise TheLimitExceededError
-                else:
-                    await token_repo.decrease_token_limit(token)
+            if rate_limiter is not None:
+                rate_limit = await self._get_rate_limit(
+                    token_digest, token_cache, db_connection
+                )
+                result = await rate_limiter.hit(token_digest.hex(), rate_limit)
+            elif token_cache is not None:
+                result = await self._check_cached_token(
+                    token_digest, token_cache, db_connection
+                )
+            else:
+                result = await self._check_token(token_digest, db_connection)
+
+            request.state.rate_limit = result
+            if not result.allowed:
+                raise TheLimitExceededError
 
         except MissingOrBadTokenError:
             return JSONResponse(
@@ -82,12 +187,85 @@ class CheckTokenMiddleware(BaseHTTPMiddleware):
             return JSONResponse(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 content={"detail": "The limit of requests exceeded"},
+                headers=rate_limit_headers(request.state.rate_limit),
             )
         except Exception:
+            logger.exception("Failed to check the request token")
             return JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal server error"},
             )
 
-        response = await call_next(request)
-        return response
+        return None
+
+    async def _check_token(
+        self, token_digest: bytes, db_connection: DatabaseConnection
+    ) -> RateLimitResult:
+        async with db_connection.get_session() as session:
+            consumed = await TokenRepo(session).consume_token_limit(token_digest)
+
+        if consumed is None:
+            raise MissingOrBadTokenError
+        admitted, remaining, limit, reset_after = consumed
+        return RateLimitResult(
+            allowed=admitted,
+            limit=limit,
+            remaining=remaining,
+            reset_after=reset_after,
+            retry_after=reset_after,
+        )
+
+    async def _check_cached_token(
+        self,
+        token_digest: bytes,
+        token_cache: TokenCache,
+        db_connection: DatabaseConnection,
+    ) -> RateLimitResult:
+        quota = await self._get_cached_quota(token_digest, token_cache, db_connection)
+        return quota.result(token_cache.consume(token_digest))
+
+    async def _get_cached_quota(
+        self,
+        token_digest: bytes,
+        token_cache: TokenCache,
+        db_connection: DatabaseConnection,
+    ) -> TokenQuota:
+        quota = token_cache.get(token_digest)
+        if quota is not None:
+            self.token_cache_lookups.inc(result="hit")
+            return quota
+
+        self.token_cache_lookups.inc(result="miss")
+        limit, last_update, rate_limit = await self._load_token(
+            token_digest, db_connection
+        )
+        return token_cache.put(token_digest, limit, last_update, rate_limit)
+
+    async def _get_rate_limit(
+        self,
+        token_digest: bytes,
+        token_cache: TokenCache | None,
+        db_connection: DatabaseConnection,
+    ) -> RateLimit:
+        if token_cache is not None:
+            quota = await self._get_cached_quota(
+                token_digest, token_cache, db_connection
+            )
+            return quota.rate_limit
+
+        _, _, rate_limit = await self._load_token(token_digest, db_connection)
+        return rate_limit
+
+    @staticmethod
+    async def _load_token(
+        token_digest: bytes, db_connection: DatabaseConnection
+    ) -> tuple[int, datetime, RateLimit]:
+        async with db_connection.get_session() as session:
+            token_info = await TokenRepo(session).get_token_info_for_validation(
+                token_digest
+            )
+        if not token_info:
+            raise MissingOrBadTokenError
+
+        limit, last_update, rate, window, burst = token_info
+        return limit, last_update, RateLimit(rate=rate, window=window, burst=burst)
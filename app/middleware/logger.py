@@ -1,14 +1,15 @@
 import logging
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import QueryStats, track_queries
 
 logger = logging.getLogger(__name__)
 
 
-class LoggerMiddleware(BaseHTTPMiddleware):
+class LoggerMiddleware:
     """Middleware to log request and response details.
 
     This middleware logs important information about incoming requests and outgoing
@@ -16,37 +17,80 @@ class LoggerMiddleware(BaseHTTPMiddleware):
     Based on the response status code, different log levels (info, warning, error) are used
     to log the outcome of the request handling.
 
+    The middleware is a plain ASGI application: it observes the response messages
+    sent by the wrapped app instead of buffering the response, so the body is
+    streamed to the client as it is produced.
+
+    With profiling on, the log record also carries the number of statements the
+    request sent to the database, the time they took and the slowest of them.
+    The statements are tracked from the outermost middleware on, so the queries
+    of the token check are included.
+
     Args:
         app (ASGIApp): The ASGI application to wrap.
+        profiling (bool): Whether to add the database profile of the request.
 
     Methods:
-        dispatch(request: Request, call_next: RequestResponseEndpoint) -> Response:
-            Intercepts the request, logs the details, and returns the response.
-            The log includes the request and response details and the time taken
-            to process the request.
+        __call__(scope: Scope, receive: Receive, send: Send) -> None:
+            Passes the request to the wrapped application, records the response
+            status and size from the sent messages and logs the details together
+            with the time taken to process the request.
     """
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-    ) -> Response:
+    def __init__(self, app: ASGIApp, profiling: bool = False) -> None:
+        self.app = app
+        self.profiling = profiling
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Process the request and log the details.
 
         This method measures the time taken to process the request and logs the request
         and response details such as request method, URL, size, response status, and size.
         Based on the status code of the response, the log level varies (info, warning, or error).
+        A request whose handling raised an exception is logged as a server error.
 
         Args:
-            request (Request): The incoming HTTP request.
-            call_next (RequestResponseEndpoint): The next ASGI application or endpoint to call.
-
-        Returns:
-            Response: The response after logging the details.
+            scope (Scope): The ASGI connection scope.
+            receive (Receive): The ASGI receive channel.
+            send (Send): The ASGI send channel.
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         start_time = time.time()
-        response = await call_next(request)
-        status_code = response.status_code
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        with track_queries() as query_stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self.log_request(
+                    Request(scope),
+                    status_code,
+                    response_size,
+                    time.time() - start_time,
+                    query_stats if self.profiling else None,
+                )
+
+    def log_request(
+        self,
+        request: Request,
+        status_code: int,
+        response_size: int,
+        duration: float,
+        query_stats: QueryStats | None = None,
+    ) -> None:
         client = request.client
-        end_time = f"{time.time() - start_time:.3f}s."
         extra = {
             "request_url": request.url,
             "request_method": request.method,
@@ -54,9 +98,19 @@ class LoggerMiddleware(BaseHTTPMiddleware):
             "request_size": int(request.headers.get("content-length", 0)),
             "request_host": f"{client.host}:{client.port}" if client else "",
             "response_status": status_code,
-            "response_size": int(response.headers.get("content-length", 0)),
-            "response_duration": end_time,
+            "response_size": response_size,
+            "response_duration": f"{duration:.3f}s.",
         }
+        if query_stats is not None:
+            extra["db_queries"] = query_stats.count
+            extra["db_duration_ms"] = round(query_stats.duration * 1000, 3)
+            extra["db_slowest_statements"] = [
+                {
+                    "statement": timing.statement,
+                    "duration_ms": round(timing.duration * 1000, 3),
+                }
+                for timing in sorted(query_stats.slowest, reverse=True)
+            ]
         if status_code <= 299:
             logger.info("Success response", extra=extra)
         elif status_code <= 399:
@@ -65,5 +119,3 @@ class LoggerMiddleware(BaseHTTPMiddleware):
             logger.warning("Client request error", extra=extra)
         else:
             logger.error("Server response error", extra=extra)
-
-        return response
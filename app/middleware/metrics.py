@@ -0,0 +1,101 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import MetricsRegistry, track_queries
+
+UNMATCHED_ROUTE = "unmatched"
+
+DB_QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class MetricsMiddleware:
+    """Middleware to record request metrics.
+
+    Requests are counted and timed by method, route template and response status,
+    so `/organization/name` is one series no matter which name was asked for,
+    and a route with path parameters is one series per template. Paths that
+    match no route are reported as `unmatched` to keep the number of series
+    bounded. The number of requests being handled is kept in a gauge, and the
+    statements each request sends to the database are counted and timed
+    through `track_queries`.
+
+    The middleware should be the outermost one, so the time spent checking the
+    token is included and rejected requests are counted too.
+
+    Args:
+        app (ASGIApp): The ASGI application to wrap.
+        registry (MetricsRegistry): The registry the metrics are reported to.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        labelnames = ["method", "route", "status"]
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP requests handled", labelnames
+        )
+        self.durations = registry.histogram(
+            "http_request_duration_seconds", "Time to handle a request", labelnames
+        )
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "HTTP requests being handled"
+        )
+        self.db_queries = registry.histogram(
+            "http_request_db_queries",
+            "Statements sent to the database per request",
+            ["method", "route"],
+            buckets=DB_QUERIES_BUCKETS,
+        )
+        self.db_durations = registry.histogram(
+            "http_request_db_duration_seconds",
+            "Time the database spent on the statements of a request",
+            ["method", "route"],
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            with track_queries() as query_stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            self.in_flight.dec()
+            method = scope["method"]
+            route = self.get_route(scope)
+            self.requests.inc(method=method, route=route, status=str(status_code))
+            self.durations.observe(
+                duration, method=method, route=route, status=str(status_code)
+            )
+            self.db_queries.observe(query_stats.count, method=method, route=route)
+            self.db_durations.observe(query_stats.duration, method=method, route=route)
+
+    @staticmethod
+    def get_route(scope: Scope) -> str:
+        """Returns the template of the route that handled or would handle the request.
+
+        The router stores the matched route in the scope. Requests answered
+        before reaching it, such as ones rejected by the token check, are
+        matched against the routes of the application here.
+        """
+        route = scope.get("route")
+        if route is None:
+            for candidate in scope["app"].router.routes:
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate
+                    break
+        return getattr(route, "path", UNMATCHED_ROUTE)
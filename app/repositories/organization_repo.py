@@ -1,190 +1,604 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from geoalchemy2 import Geography, Geometry
+from psycopg.errors import QueryCanceled
 from pydantic import UUID4
-from sqlalchemy import distinct, func, select
+from sqlalchemy import (
+    ColumnElement,
+    Executable,
+    Result,
+    Select,
+    StatementLambdaElement,
+    cast,
+    func,
+    lambda_stmt,
+    literal_column,
+    or_,
+    select,
+    text,
+    true,
+)
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.custom_exceptions import SearchTimeoutError
+from app.core.models.pydantic_models import BoundingBox
 from app.core.models.sqlalchemy_models import (
     Activities,
     ActivityClosure,
-    Buildings,
-    OrganizationActivities,
-    OrganizationPhones,
+    OrganizationDocuments,
     Organizations,
-    Phones,
 )
 
+STREAM_BATCH_SIZE = 500
+SEARCH_CONFIGS = ("russian", "english")
+
+DescendantActivities = aliased(Activities, name="descendant_activities")
+
 
 class OrganizationRepo:
     def __init__(self, con: AsyncSession) -> None:
         self._con = con
+        self._in_transaction = False
 
-    async def check_activity_exists(self, activity: str) -> bool:
-        query = select(Activities.id).where(Activities.name == activity).limit(1)
-        query_res = (await self._con.execute(query)).scalar_one_or_none()
-        return query_res is not None
+    @staticmethod
+    def _full_info_query(*filters: ColumnElement[bool]) -> Select:
+        return select(
+            OrganizationDocuments.id,
+            OrganizationDocuments.name,
+            OrganizationDocuments.address,
+            OrganizationDocuments.office,
+            OrganizationDocuments.phones,
+            OrganizationDocuments.activities,
+        ).where(*filters)
 
-    async def get_all_organizations_from_activity(self, activity: str) -> list[str]:
-        query = (
-            select(Organizations.name)
-            .join(OrganizationActivities)
-            .join(Activities)
-            .where(Activities.name == activity)
+    @staticmethod
+    def _row_to_dict(result: Any) -> dict:
+        return {
+            "id": result.id,
+            "name": result.name,
+            "address": result.address,
+            "office": result.office,
+            "phones": result.phones,
+            "activities": result.activities,
+        }
+
+    @staticmethod
+    def _paginate(query: Select, limit: int | None, after_id: UUID4 | None) -> Select:
+        if after_id is not None:
+            query = query.where(OrganizationDocuments.id > after_id)
+        if limit is not None:
+            query = query.order_by(OrganizationDocuments.id).limit(limit)
+        return query
+
+    # reads are built as lambda statements: SQLAlchemy caches the construct per
+    # call site and only extracts fresh parameter values from the closures, so
+    # any Python computation on those values has to happen outside the lambdas
+    @staticmethod
+    def _paginate_statement(
+        statement: StatementLambdaElement, limit: int | None, after_id: UUID4 | None
+    ) -> StatementLambdaElement:
+        if after_id is not None:
+            statement += lambda query: query.where(OrganizationDocuments.id > after_id)
+        if limit is not None:
+            statement += lambda query: query.order_by(OrganizationDocuments.id).limit(
+                limit
+            )
+        return statement
+
+    @staticmethod
+    def _activities_filter(activities: list[str]) -> ColumnElement[bool]:
+        return OrganizationDocuments.activities.overlap(activities)
+
+    @staticmethod
+    def _point(latitude: float, longitude: float) -> ColumnElement:
+        return cast(
+            func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+            Geography(geometry_type="POINT", srid=4326),
+        )
+
+    @classmethod
+    def _radius_filter(
+        cls, latitude: float, longitude: float, radius: float
+    ) -> ColumnElement[bool]:
+        return func.ST_DWithin(
+            OrganizationDocuments.location, cls._point(latitude, longitude), radius
+        )
+
+    @staticmethod
+    def _bbox_filter(
+        min_longitude: float,
+        min_latitude: float,
+        max_longitude: float,
+        max_latitude: float,
+    ) -> ColumnElement[bool]:
+        envelope = func.ST_MakeEnvelope(
+            min_longitude, min_latitude, max_longitude, max_latitude, 4326
+        )
+        return OrganizationDocuments.location.op("&&")(
+            cast(envelope, Geography(geometry_type="POLYGON", srid=4326))
         )
-        query_res = (await self._con.execute(query)).scalars().all()
-        return list(query_res)
+
+    @staticmethod
+    def _name_document() -> ColumnElement:
+        # must stay identical to the idx_organizations_name_tsvector expression
+        russian, english = (
+            func.to_tsvector(
+                literal_column(f"'{config}'::regconfig"), Organizations.name
+            )
+            for config in SEARCH_CONFIGS
+        )
+        return russian.op("||")(english)
+
+    @staticmethod
+    def _name_query(query: str) -> ColumnElement:
+        russian, english = (
+            func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), query)
+            for config in SEARCH_CONFIGS
+        )
+        return russian.op("||")(english)
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+    @classmethod
+    def _address_pattern(cls, city: str, street: str, house_num: str) -> str:
+        parts = (cls._escape_like(part) for part in (city, street, house_num))
+        return f"%{'%'.join(parts)}%"
+
+    @staticmethod
+    def _address_filter(pattern: str) -> ColumnElement[bool]:
+        # served by the idx_organization_documents_address_trgm GIN index, which
+        # extracts trigrams from every literal part of the pattern
+        return OrganizationDocuments.address.ilike(pattern, escape="!")
+
+    async def _get_organizations_full_info(
+        self,
+        statement: StatementLambdaElement,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> list[dict]:
+        query = self._paginate_statement(statement, limit, after_id)
+        results = (await self._execute(query)).fetchall()
+        return [self._row_to_dict(result) for result in results]
+
+    async def _execute(self, statement: Executable) -> Result:
+        """Runs a read and hands the connection back to the pool right away.
+
+        The rows are buffered first, so the autocommit read session needs no
+        connection until its next statement checks one out again, and none is
+        held while the response is serialized. Inside `_read_only_transaction`
+        the connection is kept until the COMMIT.
+        """
+        result = (await self._con.execute(statement)).freeze()
+        if not self._in_transaction:
+            await self._con.close()
+        return result()
+
+    @asynccontextmanager
+    async def _read_only_transaction(self) -> AsyncIterator[None]:
+        """Wraps statements of the autocommit read session in one transaction.
+
+        Server-side cursors and SET LOCAL only live inside a transaction block.
+        COMMIT ends an aborted transaction as well, by rolling it back.
+        """
+        await self._con.execute(text("BEGIN READ ONLY"))
+        self._in_transaction = True
+        try:
+            yield
+        finally:
+            self._in_transaction = False
+            await self._con.execute(text("COMMIT"))
+            await self._con.close()
+
+    async def _stream_organizations_full_info(
+        self, statement: StatementLambdaElement
+    ) -> AsyncIterator[dict]:
+        statement += lambda query: query.order_by(OrganizationDocuments.id)
+        async with self._read_only_transaction():
+            results = await self._con.stream(
+                statement, execution_options={"yield_per": STREAM_BATCH_SIZE}
+            )
+            try:
+                async for result in results:
+                    yield self._row_to_dict(result)
+            finally:
+                await results.close()
+
+    async def _get_organization_full_info(
+        self, statement: StatementLambdaElement
+    ) -> dict | None:
+        result = (await self._execute(statement)).first()
+        return self._row_to_dict(result) if result else None
 
     async def get_organization_by_id(self, org_id: UUID4) -> str | None:
-        query = select(Organizations.name).where(Organizations.id == org_id)
-        query_res = (await self._con.execute(query)).scalar_one_or_none()
+        query = lambda_stmt(
+            lambda: select(Organizations.name).where(Organizations.id == org_id)
+        )
+        query_res = (await self._execute(query)).scalar_one_or_none()
         return query_res
 
-    async def get_organizations_within_radius(
-        self, latitude: float, longitude: float, radius: float
-    ) -> list[str]:
-        query = (
-            select(Organizations.name)
-            .join(Buildings)
-            .where(
-                func.ST_DWithin(
-                    Buildings.location,
-                    func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
-                    radius,
+    async def get_organization_full_info(self, org_id: UUID4) -> dict | None:
+        return await self._get_organization_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationDocuments.id == org_id
                 )
             )
         )
-        result = (await self._con.execute(query)).scalars().all()
-        return list(result)
-
-    async def get_organization_full_info(self, org_id: UUID4) -> dict | None:
-        query = (
-            select(
-                Organizations.name,
-                Buildings.address,
-                Buildings.office,
-                func.array_agg(distinct(Phones.phone_number)).label("phones"),
-                func.array_agg(distinct(Activities.name)).label("activities"),
-            )
-            .select_from(Organizations)
-            .join(Buildings, isouter=True)
-            .join(OrganizationPhones, isouter=True)
-            .join(Phones, isouter=True)
-            .join(OrganizationActivities, isouter=True)
-            .join(Activities, isouter=True)
-            .where(Organizations.id == org_id)
-            .group_by(Organizations.name, Buildings.address, Buildings.office)
-        )
-
-        result = (await self._con.execute(query)).first()
-        if not result:
-            return None
 
-        return {
-            "name": result.name,
-            "address": result.address,
-            "office": result.office,
-            "phones": [p for p in result.phones if p is not None],
-            "activities": [a for a in result.activities if a is not None],
-        }
+    async def get_organization_full_info_by_name(self, org_name: str) -> dict | None:
+        return await self._get_organization_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationDocuments.name == org_name
+                )
+            )
+        )
 
     async def get_organizations_full_info_by_names(
         self, org_names: list[str]
     ) -> list[dict]:
-        if not org_names:
+        return await self.get_organizations_full_info_by_ids_and_names([], org_names)
+
+    async def get_organizations_full_info_by_ids_and_names(
+        self, org_ids: list[UUID4], org_names: list[str]
+    ) -> list[dict]:
+        if not org_ids and not org_names:
             return []
 
-        query = (
-            select(
-                Organizations.id,
-                Organizations.name,
-                Buildings.address,
-                Buildings.office,
-                func.array_agg(distinct(Phones.phone_number)).label("phones"),
-                func.array_agg(distinct(Activities.name)).label("activities"),
-            )
-            .select_from(Organizations)
-            .join(Buildings, isouter=True)
-            .join(OrganizationPhones, isouter=True)
-            .join(Phones, isouter=True)
-            .join(OrganizationActivities, isouter=True)
-            .join(Activities, isouter=True)
-            .where(Organizations.name.in_(org_names))
-            .group_by(
-                Organizations.id,
-                Organizations.name,
-                Buildings.address,
-                Buildings.office,
-            )
-        )
-
-        results = (await self._con.execute(query)).fetchall()
+        return await self._get_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    or_(
+                        OrganizationDocuments.id.in_(org_ids),
+                        OrganizationDocuments.name.in_(org_names),
+                    )
+                )
+            )
+        )
 
+    async def get_activity_tree(self) -> list[dict]:
+        query = lambda_stmt(
+            lambda: select(
+                Activities.id,
+                Activities.name,
+                func.array_remove(
+                    func.array_agg(ActivityClosure.ancestor_id), None
+                ).label("ancestor_ids"),
+            )
+            .join(
+                ActivityClosure,
+                ActivityClosure.descendant_id == Activities.id,
+                isouter=True,
+            )
+            .group_by(Activities.id)
+        )
+        results = (await self._execute(query)).fetchall()
         return [
-            {
-                "id": result.id,
-                "name": result.name,
-                "address": result.address,
-                "office": result.office,
-                "phones": [p for p in result.phones if p is not None],
-                "activities": [a for a in result.activities if a is not None],
-            }
+            {"id": result.id, "name": result.name, "ancestor_ids": result.ancestor_ids}
             for result in results
         ]
 
-    async def get_organizations_by_address_parts(
-        self, city: str, street: str, house_num: str
-    ) -> list[str]:
-        address_pattern = f"%{city}%{street}%{house_num}%"
+    async def get_organizations_full_info_by_activities(
+        self,
+        activities: list[str],
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> list[dict]:
+        return await self._get_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._activities_filter(activities)
+                )
+            ),
+            limit=limit,
+            after_id=after_id,
+        )
 
+    async def get_activity_with_organizations_full_info(
+        self,
+        activity: str,
+        include_descendants: bool = False,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> tuple[bool, list[dict]]:
+        """Looks up the activity and its organizations in a single statement.
+
+        The activity row is left joined with its organizations, so a known
+        activity always yields at least one row and an unknown one yields none.
+        """
+        if include_descendants:
+            descendant_names = func.array_remove(
+                func.array_agg(DescendantActivities.name), None
+            )
+            target = (
+                select(
+                    Activities.id,
+                    func.array_append(descendant_names, Activities.name).label("names"),
+                )
+                .outerjoin(
+                    ActivityClosure, ActivityClosure.ancestor_id == Activities.id
+                )
+                .outerjoin(
+                    DescendantActivities,
+                    DescendantActivities.id == ActivityClosure.descendant_id,
+                )
+                .where(Activities.name == activity)
+                .group_by(Activities.id)
+                .subquery("target")
+            )
+        else:
+            target = (
+                select(Activities.id, array([Activities.name]).label("names"))
+                .where(Activities.name == activity)
+                .subquery("target")
+            )
+
+        documents = self._paginate(
+            self._full_info_query(
+                OrganizationDocuments.activities.overlap(target.c.names)
+            ),
+            limit,
+            after_id,
+        ).lateral("documents")
         query = (
-            select(Organizations.name)
-            .join(Buildings)
-            .where(Buildings.address.ilike(address_pattern))
+            select(documents)
+            .select_from(target)
+            .outerjoin(documents, true())
+            .order_by(documents.c.id)
         )
-        query_res = (await self._con.execute(query)).scalars().all()
-        return list(query_res)
+        results = (await self._execute(query)).fetchall()
+        return bool(results), [
+            self._row_to_dict(result) for result in results if result.id is not None
+        ]
 
-    async def get_organizations_by_ancestor_activity_optimized(
-        self, ancestor_name: str
-    ) -> list[str]:
-        query = (
-            select(distinct(Organizations.name))
-            .join(OrganizationActivities)
-            .join(Activities)
-            .join(ActivityClosure, ActivityClosure.descendant_id == Activities.id)
-            .where(
-                ActivityClosure.ancestor_id
-                == (select(Activities.id).where(Activities.name == ancestor_name))
+    async def get_organizations_full_info_within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> list[dict]:
+        return await self._get_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._radius_filter(latitude, longitude, radius)
+                )
+            ),
+            limit=limit,
+            after_id=after_id,
+        )
+
+    async def get_organizations_full_info_by_address_parts(
+        self,
+        city: str,
+        street: str,
+        house_num: str,
+        limit: int | None = None,
+        after_id: UUID4 | None = None,
+    ) -> list[dict]:
+        pattern = self._address_pattern(city, street, house_num)
+        return await self._get_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._address_filter(pattern)
+                )
+            ),
+            limit=limit,
+            after_id=after_id,
+        )
+
+    def stream_organizations_full_info_by_activities(
+        self, activities: list[str]
+    ) -> AsyncIterator[dict]:
+        return self._stream_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._activities_filter(activities)
+                )
             )
         )
-        query_res = (await self._con.execute(query)).scalars().all()
-        return list(query_res)
 
-    async def get_organization_full_info_by_name(self, org_name: str) -> dict | None:
+    def stream_organizations_full_info_within_radius(
+        self, latitude: float, longitude: float, radius: float
+    ) -> AsyncIterator[dict]:
+        return self._stream_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._radius_filter(latitude, longitude, radius)
+                )
+            )
+        )
+
+    def stream_organizations_full_info_by_address_parts(
+        self, city: str, street: str, house_num: str
+    ) -> AsyncIterator[dict]:
+        pattern = self._address_pattern(city, street, house_num)
+        return self._stream_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._address_filter(pattern)
+                )
+            )
+        )
+
+    async def get_nearest_organizations_full_info(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[dict]:
+        query = lambda_stmt(
+            lambda: OrganizationRepo._full_info_query()
+            .add_columns(
+                func.ST_Distance(
+                    OrganizationDocuments.location,
+                    OrganizationRepo._point(latitude, longitude),
+                ).label("distance")
+            )
+            .order_by(
+                OrganizationDocuments.location.op("<->")(
+                    OrganizationRepo._point(latitude, longitude)
+                )
+            )
+            .limit(k)
+        )
+        results = (await self._execute(query)).fetchall()
+        return [
+            {**self._row_to_dict(result), "distance": result.distance}
+            for result in results
+        ]
+
+    async def count_organizations_in_bbox(self, bbox: BoundingBox) -> int:
+        min_longitude, min_latitude = bbox.min_longitude, bbox.min_latitude
+        max_longitude, max_latitude = bbox.max_longitude, bbox.max_latitude
+        query = lambda_stmt(
+            lambda: select(func.count(OrganizationDocuments.id)).where(
+                OrganizationRepo._bbox_filter(
+                    min_longitude, min_latitude, max_longitude, max_latitude
+                )
+            )
+        )
+        return (await self._execute(query)).scalar_one()
+
+    async def get_organizations_full_info_in_bbox(
+        self, bbox: BoundingBox, limit: int | None = None
+    ) -> list[dict]:
+        min_longitude, min_latitude = bbox.min_longitude, bbox.min_latitude
+        max_longitude, max_latitude = bbox.max_longitude, bbox.max_latitude
+        return await self._get_organizations_full_info(
+            lambda_stmt(
+                lambda: OrganizationRepo._full_info_query(
+                    OrganizationRepo._bbox_filter(
+                        min_longitude, min_latitude, max_longitude, max_latitude
+                    )
+                )
+            ),
+            limit=limit,
+        )
+
+    async def get_organization_clusters_in_bbox(
+        self, bbox: BoundingBox, grid_size: int
+    ) -> list[dict]:
+        location = cast(
+            OrganizationDocuments.location, Geometry(geometry_type="POINT", srid=4326)
+        )
+        longitude = func.ST_X(location)
+        latitude = func.ST_Y(location)
+        cell_width = (bbox.max_longitude - bbox.min_longitude) / grid_size or 1
+        cell_height = (bbox.max_latitude - bbox.min_latitude) / grid_size or 1
+        cells = (
+            select(
+                func.least(
+                    func.floor((longitude - bbox.min_longitude) / cell_width),
+                    grid_size - 1,
+                ).label("cell_x"),
+                func.least(
+                    func.floor((latitude - bbox.min_latitude) / cell_height),
+                    grid_size - 1,
+                ).label("cell_y"),
+                latitude.label("latitude"),
+                longitude.label("longitude"),
+            )
+            .where(
+                self._bbox_filter(
+                    bbox.min_longitude,
+                    bbox.min_latitude,
+                    bbox.max_longitude,
+                    bbox.max_latitude,
+                )
+            )
+            .subquery()
+        )
         query = (
             select(
-                Organizations.name,
-                Buildings.address,
-                Buildings.office,
-                func.array_agg(distinct(Phones.phone_number)).label("phones"),
-                func.array_agg(distinct(Activities.name)).label("activities"),
-            )
-            .select_from(Organizations)
-            .join(Buildings, isouter=True)
-            .join(OrganizationPhones, isouter=True)
-            .join(Phones, isouter=True)
-            .join(OrganizationActivities, isouter=True)
-            .join(Activities, isouter=True)
-            .where(Organizations.name == org_name)
-            .group_by(Organizations.name, Buildings.address, Buildings.office)
-        )
-
-        result = (await self._con.execute(query)).first()
-        if not result:
-            return None
+                func.avg(cells.c.latitude).label("latitude"),
+                func.avg(cells.c.longitude).label("longitude"),
+                func.count().label("count"),
+            )
+            .group_by(cells.c.cell_x, cells.c.cell_y)
+            .order_by(cells.c.cell_y, cells.c.cell_x)
+        )
+        results = (await self._execute(query)).fetchall()
+        return [
+            {
+                "latitude": result.latitude,
+                "longitude": result.longitude,
+                "count": result.count,
+            }
+            for result in results
+        ]
 
-        return {
-            "name": result.name,
-            "address": result.address,
-            "office": result.office,
-            "phones": [p for p in result.phones if p is not None],
-            "activities": [a for a in result.activities if a is not None],
-        }
+    async def search_organizations_full_info(
+        self, query: str, limit: int, statement_timeout: int
+    ) -> list[dict]:
+        document = self._name_document()
+        ts_query = self._name_query(query)
+        rank = (
+            func.ts_rank(document, ts_query)
+            + func.similarity(Organizations.name, query)
+        ).label("rank")
+        matches = (
+            select(Organizations.id.label("organization_id"), rank)
+            .where(
+                document.bool_op("@@")(ts_query)
+                | Organizations.name.bool_op("%")(query)
+            )
+            .order_by(rank.desc())
+            .limit(limit)
+            .subquery()
+        )
+        search_query = (
+            self._full_info_query()
+            .add_columns(matches.c.rank)
+            .join(matches, matches.c.organization_id == OrganizationDocuments.id)
+            .order_by(matches.c.rank.desc(), OrganizationDocuments.id)
+        )
+        try:
+            # the transaction scopes the timeout to this query
+            async with self._read_only_transaction():
+                await self._con.execute(
+                    select(
+                        func.set_config(
+                            "statement_timeout", f"{statement_timeout}ms", True
+                        )
+                    )
+                )
+                results = (await self._execute(search_query)).fetchall()
+        except DBAPIError as err:
+            if isinstance(err.orig, QueryCanceled):
+                raise SearchTimeoutError from err
+            raise
+        return [
+            {**self._row_to_dict(result), "rank": result.rank} for result in results
+        ]
+
+    async def refresh_organization_documents(self) -> bool:
+        # every worker runs the refresher, the transaction-level advisory lock
+        # lets one of them rebuild the view while the others skip the refresh.
+        # They still wait for the lock, so they only return, and reload their
+        # caches, once the view has been refreshed
+        locked = (
+            await self._con.execute(
+                text(
+                    "SELECT pg_try_advisory_xact_lock("
+                    "hashtext('organization_documents'))"
+                )
+            )
+        ).scalar_one()
+        if not locked:
+            await self._con.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext('organization_documents'))")
+            )
+            return False
+
+        # CONCURRENTLY keeps the view readable during the refresh, it relies on
+        # the unique idx_organization_documents_id index
+        await self._con.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY organization_documents")
+        )
+        return True
@@ -3,11 +3,26 @@ from datetime import datetime
 from typing import Optional
 
 from pydantic import UUID4
-from sqlalchemy import func, insert, select, update
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    LargeBinary,
+    case,
+    column,
+    extract,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.models.pydantic_models import ApiKey
 from app.core.models.sqlalchemy_models import ApiTokens, Users
+from app.core.utils import get_token_prefix, hash_token
 
 
 class TokenRepo:
@@ -33,13 +48,13 @@ class TokenRepo:
         return secrets.token_urlsafe(32)
 
     async def insert_api_token(self, user_id: UUID4, api_key: str) -> str:
-        query = (
-            insert(ApiTokens)
-            .values(user_id=user_id, token=api_key)
-            .returning(ApiTokens.token)
+        query = insert(ApiTokens).values(
+            user_id=user_id,
+            token_digest=hash_token(api_key),
+            token_prefix=get_token_prefix(api_key),
         )
-        query_res = (await self._con.execute(query)).scalar_one()
-        return query_res
+        await self._con.execute(query)
+        return api_key
 
     async def get_quantity_of_tokens(self, user_id: UUID4) -> int:
         query = select(func.count(ApiTokens.id)).where(ApiTokens.user_id == user_id)
@@ -52,28 +67,133 @@ class TokenRepo:
         return [ApiKey.model_validate(token_data) for token_data in query_res]
 
     async def get_token_info_for_validation(
-        self, token: str
-    ) -> Optional[tuple[int, datetime]]:
-        query = select(ApiTokens.limit, ApiTokens.last_update).where(
-            ApiTokens.token == token
+        self, token_digest: bytes
+    ) -> Optional[tuple[int, datetime, int, int, int]]:
+        query = select(
+            ApiTokens.limit,
+            ApiTokens.last_update,
+            ApiTokens.rate_limit,
+            ApiTokens.rate_window,
+            ApiTokens.burst,
+        ).where(ApiTokens.token_digest == token_digest)
+        query_res = (await self._con.execute(query)).first()
+        if query_res is None:
+            return None
+        return (
+            query_res.limit,
+            query_res.last_update,
+            query_res.rate_limit,
+            query_res.rate_window,
+            query_res.burst,
+        )
+
+    async def consume_token_limit(
+        self, token_digest: bytes
+    ) -> Optional[tuple[bool, int, int, float]]:
+        """Spends one request of the token quota in a single statement.
+
+        The window is reset to the `rate_limit` of the token once it is older
+        than its `rate_window`, otherwise the limit is decreased if any requests
+        are left. Concurrent updates of the same token wait for each other and
+        recheck the row, so no more than `rate_limit` requests are ever admitted
+        in a window.
+
+        Returns:
+            Optional[tuple[bool, int, int, float]]: None if the token does not
+                exist, otherwise whether the request was admitted, the requests
+                left, the limit of the window and the seconds until it resets.
+        """
+        window = ApiTokens.rate_window * literal_column("interval '1 second'")
+        window_expired = or_(
+            ApiTokens.last_update.is_(None),
+            func.now() - ApiTokens.last_update > window,
+        )
+        consumed = (
+            update(ApiTokens)
+            .where(
+                ApiTokens.token_digest == token_digest,
+                or_(window_expired, ApiTokens.limit > 0),
+            )
+            .values(
+                limit=case(
+                    (window_expired, ApiTokens.rate_limit - 1),
+                    else_=ApiTokens.limit - 1,
+                ),
+                last_update=case(
+                    (window_expired, func.now()),
+                    else_=ApiTokens.last_update,
+                ),
+            )
+            .returning(ApiTokens.id, ApiTokens.limit, ApiTokens.last_update)
+            .cte("consumed")
+        )
+        # the select sees the token as it was before the update, so it tells an
+        # unknown token apart from a spent quota
+        query = (
+            select(
+                consumed.c.id.is_not(None).label("admitted"),
+                func.coalesce(consumed.c.limit, ApiTokens.limit).label("remaining"),
+                ApiTokens.rate_limit,
+                extract(
+                    "epoch",
+                    func.coalesce(consumed.c.last_update, ApiTokens.last_update)
+                    + window
+                    - func.now(),
+                ).label("reset_after"),
+            )
+            .select_from(ApiTokens)
+            .outerjoin(consumed, consumed.c.id == ApiTokens.id)
+            .where(ApiTokens.token_digest == token_digest)
         )
         query_res = (await self._con.execute(query)).first()
-        return (query_res.limit, query_res.last_update) if query_res else None
+        if query_res is None:
+            return None
+        return (
+            query_res.admitted,
+            query_res.remaining,
+            query_res.rate_limit,
+            float(query_res.reset_after),
+        )
+
+    async def decrease_token_limits(self, usage: dict[bytes, int]) -> None:
+        if not usage:
+            return
 
-    async def decrease_token_limit(self, token: str) -> None:
+        usage_values = values(
+            column("token_digest", LargeBinary),
+            column("used", Integer),
+            name="usage",
+        ).data(list(usage.items()))
         query = (
             update(ApiTokens)
-            .where(ApiTokens.token == token)
-            .values(limit=ApiTokens.limit - 1)
+            .where(ApiTokens.token_digest == usage_values.c.token_digest)
+            .values(limit=ApiTokens.limit - usage_values.c.used)
         )
         await self._con.execute(query)
 
-    async def reset_token_limit_and_decrease(
-        self, token: str, limit: int = 100
+    async def reset_token_limits_and_decrease(
+        self, usage: dict[bytes, tuple[int, datetime]]
     ) -> None:
+        if not usage:
+            return
+
+        usage_values = values(
+            column("token_digest", LargeBinary),
+            column("used", Integer),
+            column("window_start", DateTime),
+            name="usage",
+        ).data(
+            [
+                (token_digest, used, start)
+                for token_digest, (used, start) in usage.items()
+            ]
+        )
         query = (
             update(ApiTokens)
-            .where(ApiTokens.token == token)
-            .values(limit=limit - 1, last_update=func.now())
+            .where(ApiTokens.token_digest == usage_values.c.token_digest)
+            .values(
+                limit=ApiTokens.rate_limit - usage_values.c.used,
+                last_update=usage_values.c.window_start,
+            )
         )
         await self._con.execute(query)
@@ -1,14 +1,24 @@
+from .cached_service import CachedService
 from .organization_service import (
+    GetNearestOrganizationsService,
     GetOrganizationByIDService,
     GetOrganizationByNameService,
+    GetOrganizationsBatchService,
     GetOrganizationsFromActivityService,
     GetOrganizationsFromAddressService,
     GetOrganizationsFromAncestorActivityService,
     GetOrganizationsFromGeoService,
+    GetOrganizationsInBoxService,
+    SearchOrganizationsService,
+    StreamOrganizationsFromActivityService,
+    StreamOrganizationsFromAddressService,
+    StreamOrganizationsFromAncestorActivityService,
+    StreamOrganizationsFromGeoService,
 )
 from .token_service import GetApiTokensService, IssueApiTokenService
 
 __all__ = [
+    "CachedService",
     "IssueApiTokenService",
     "GetApiTokensService",
     "GetOrganizationByNameService",
@@ -17,4 +27,12 @@ __all__ = [
     "GetOrganizationByIDService",
     "GetOrganizationsFromAncestorActivityService",
     "GetOrganizationsFromGeoService",
+    "GetNearestOrganizationsService",
+    "GetOrganizationsInBoxService",
+    "SearchOrganizationsService",
+    "GetOrganizationsBatchService",
+    "StreamOrganizationsFromAddressService",
+    "StreamOrganizationsFromActivityService",
+    "StreamOrganizationsFromAncestorActivityService",
+    "StreamOrganizationsFromGeoService",
 ]
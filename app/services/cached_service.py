@@ -0,0 +1,43 @@
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+from pydantic import TypeAdapter
+
+from app.core.cache import ResponseCache
+from app.core.models.pydantic_models import Organization, OrganizationPage
+
+T = TypeVar("T")
+
+ORGANIZATION_BY_NAME_NAMESPACE = "organization_by_name"
+ORGANIZATION_BY_ID_NAMESPACE = "organization_by_id"
+ORGANIZATIONS_FROM_ACTIVITY_NAMESPACE = "organizations_from_activity"
+ORGANIZATIONS_FROM_ANCESTOR_ACTIVITY_NAMESPACE = "organizations_from_ancestor_activity"
+
+organization_adapter: TypeAdapter[Organization] = TypeAdapter(Organization)
+organization_page_adapter: TypeAdapter[OrganizationPage] = TypeAdapter(OrganizationPage)
+
+
+class CachedService(Generic[T]):
+    """Wraps a service call with the response cache.
+
+    The cache key is built from `namespace` and the call arguments, so the
+    wrapper can stand in for any service that implements `__call__`.
+    """
+
+    def __init__(
+        self,
+        service: Callable[..., Awaitable[T]],
+        response_cache: ResponseCache,
+        namespace: str,
+        type_adapter: TypeAdapter[T],
+    ) -> None:
+        self._service = service
+        self._response_cache = response_cache
+        self._namespace = namespace
+        self._type_adapter = type_adapter
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> T:
+        key = self._response_cache.make_key(self._namespace, args, kwargs)
+        return await self._response_cache.get_or_set(
+            key, self._type_adapter, lambda: self._service(*args, **kwargs)
+        )
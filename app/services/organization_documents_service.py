@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+from app.core.cache import ActivityIndex, ResponseCache
+from app.core.configs.database import DatabaseConnection
+from app.repositories.organization_repo import OrganizationRepo
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_organization_documents(db_connection: DatabaseConnection) -> bool:
+    """Rebuilds the organization_documents read model from the normalized tables.
+
+    Returns False when another worker was refreshing it at the same time, once
+    that refresh has finished.
+    """
+    async with db_connection.get_session() as session:
+        return await OrganizationRepo(session).refresh_organization_documents()
+
+
+async def warm_activity_index(
+    db_connection: DatabaseConnection, activity_index: ActivityIndex
+) -> None:
+    """Loads the activity tree so that requests do not have to.
+
+    A failed load, for example before the migrations have been applied, is
+    only logged, and the tree is then loaded by the first request using it.
+    """
+    try:
+        async with db_connection.get_read_session() as session:
+            await activity_index.get_tree(OrganizationRepo(session).get_activity_tree)
+    except Exception:
+        logger.warning(
+            "Failed to load the activity index, it is loaded on first use",
+            exc_info=True,
+        )
+
+
+async def run_organization_documents_refresher(
+    db_connection: DatabaseConnection,
+    activity_index: ActivityIndex,
+    response_cache: ResponseCache,
+    interval: float,
+) -> None:
+    """Refreshes the read model on startup and then every `interval` seconds.
+
+    Only one worker rebuilds the view at a time, the others wait for that
+    refresh to finish instead of running their own. Every worker then drops
+    its cached responses and reloads its activity index from the refreshed
+    read model, so reads lag behind writes to the normalized tables by up to
+    about `interval` seconds.
+    """
+    while True:
+        try:
+            if not await refresh_organization_documents(db_connection):
+                logger.debug("Organization documents are refreshed by another worker")
+        except Exception:
+            logger.exception("Failed to refresh organization documents")
+        else:
+            activity_index.invalidate()
+            await response_cache.invalidate()
+            await warm_activity_index(db_connection, activity_index)
+        await asyncio.sleep(interval)
@@ -1,14 +1,33 @@
+from collections.abc import AsyncIterator
+from typing import Any, TypeVar, overload
+
 from pydantic import UUID4
 
+from app.core.cache import ActivityIndex, ActivityTree
 from app.core.custom_exceptions import (
     ActivityNotFoundError,
     AddressNotFoundError,
+    BatchTooLargeError,
     OrganizationNotFoundError,
 )
-from app.core.models.pydantic_models import Address, Organization
+from app.core.models.pydantic_models import (
+    Address,
+    BoundingBox,
+    GridCluster,
+    Organization,
+    OrganizationBatchItem,
+    OrganizationBatchRequest,
+    OrganizationPage,
+    OrganizationsInBox,
+    OrganizationWithDistance,
+    OrganizationWithRank,
+)
 from app.core.schemas.repo_protocols import OrganizationRepoProtocol
+from app.core.utils import decode_cursor, encode_cursor
 from app.services.mixins_service import OrganizationMixinService
 
+OrganizationT = TypeVar("OrganizationT", bound=Organization)
+
 
 class OrganizationCommonService(OrganizationMixinService):
     def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
@@ -21,34 +40,152 @@ class OrganizationCommonService(OrganizationMixinService):
         if not org_info:
             raise OrganizationNotFoundError
 
-        address = Address(address=org_info["address"] or "", office=org_info["office"])
+        return self._create_organization_from_dict(org_info)
+
+    @overload
+    def _create_organization_from_dict(self, org_data: dict) -> Organization: ...
+
+    @overload
+    def _create_organization_from_dict(
+        self, org_data: dict, model: type[OrganizationT], *extra_fields: str
+    ) -> OrganizationT: ...
+
+    def _create_organization_from_dict(
+        self,
+        org_data: dict,
+        model: type[Any] = Organization,
+        *extra_fields: str,
+    ) -> Any:
+        """Maps a row of the read model to an organization.
+
+        Rows with extra columns, such as the distance or the search rank, are
+        mapped to the `model` extending `Organization` with `extra_fields`.
+        """
+        address = Address(address=org_data["address"] or "", office=org_data["office"])
 
-        return Organization(
-            name=org_info["name"],
-            phones_numbers=org_info["phones"],
+        return model(
+            name=org_data["name"],
+            phones_numbers=org_data["phones"],
             address=address,
-            activities=org_info["activities"],
+            activities=org_data["activities"],
+            **{field: org_data[field] for field in extra_fields},
         )
 
     def _create_organizations_from_dict_list(
         self, org_data_list: list[dict]
     ) -> list[Organization]:
-        organizations = []
+        return [
+            self._create_organization_from_dict(org_data) for org_data in org_data_list
+        ]
+
+    async def _create_organizations_stream(
+        self, org_data_stream: AsyncIterator[dict], first: dict | None = None
+    ) -> AsyncIterator[Organization]:
+        if first is not None:
+            yield self._create_organization_from_dict(first)
+        async for org_data in org_data_stream:
+            yield self._create_organization_from_dict(org_data)
+
+    def _create_organizations_page(
+        self, org_data_list: list[dict], limit: int
+    ) -> OrganizationPage:
+        """Builds a page from rows fetched with `limit + 1` as the query limit.
+
+        The extra row only tells whether another page exists; the cursor of the
+        next page points at the last organization of the current one.
+        """
+        page_data = org_data_list[:limit]
+        next_cursor = (
+            encode_cursor(page_data[-1]["id"]) if len(org_data_list) > limit else None
+        )
+        return OrganizationPage(
+            items=self._create_organizations_from_dict_list(page_data),
+            next_cursor=next_cursor,
+        )
+
+
+class ActivityCommonService(OrganizationCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> None:
+        super().__init__(organization_repo)
+        self._activity_index = activity_index
+
+    async def _get_activity_tree(self) -> ActivityTree:
+        return await self._activity_index.get_tree(
+            self._organization_repo.get_activity_tree
+        )
 
-        for org_data in org_data_list:
-            address = Address(
-                address=org_data["address"] or "", office=org_data["office"]
+    @staticmethod
+    def _resolve_activity_names(
+        tree: ActivityTree, activity: str, include_descendants: bool
+    ) -> list[str] | None:
+        if include_descendants:
+            return tree.get_descendant_names(activity)
+        return [activity] if tree.get_id(activity) is not None else None
+
+    async def _get_activity_organizations(
+        self,
+        activity: str,
+        include_descendants: bool,
+        limit: int,
+        after_id: UUID4 | None,
+    ) -> list[dict]:
+        """Fetches a page of organizations for the activity.
+
+        Activities missing from the index, e.g. added since its last reload,
+        are looked up together with their organizations in one statement, and
+        the index is invalidated when such an activity turns out to exist.
+        """
+        tree = await self._get_activity_tree()
+        activity_names = self._resolve_activity_names(
+            tree, activity, include_descendants
+        )
+        if activity_names is not None:
+            return (
+                await self._organization_repo.get_organizations_full_info_by_activities(
+                    activity_names, limit=limit, after_id=after_id
+                )
             )
 
-            organization = Organization(
-                name=org_data["name"],
-                phones_numbers=org_data["phones"],
-                address=address,
-                activities=org_data["activities"],
+        found, org_data_list = (
+            await self._organization_repo.get_activity_with_organizations_full_info(
+                activity, include_descendants, limit=limit, after_id=after_id
             )
-            organizations.append(organization)
+        )
+        if not found:
+            raise ActivityNotFoundError
+        self._activity_index.invalidate()
+        return org_data_list
+
+    async def _get_activity_names(
+        self, activity: str, include_descendants: bool
+    ) -> list[str]:
+        """Resolves the activity names to filter organizations by.
+
+        On an index miss the activity is checked with the same single statement
+        and the index is reloaded only if the activity does exist.
+        """
+        tree = await self._get_activity_tree()
+        activity_names = self._resolve_activity_names(
+            tree, activity, include_descendants
+        )
+        if activity_names is not None:
+            return activity_names
 
-        return organizations
+        found, _ = (
+            await self._organization_repo.get_activity_with_organizations_full_info(
+                activity, include_descendants, limit=0
+            )
+        )
+        if not found:
+            raise ActivityNotFoundError
+        self._activity_index.invalidate()
+        tree = await self._get_activity_tree()
+        activity_names = self._resolve_activity_names(
+            tree, activity, include_descendants
+        )
+        return activity_names if activity_names is not None else [activity]
 
 
 class GetOrganizationByNameService(OrganizationCommonService):
@@ -64,113 +201,267 @@ class GetOrganizationsFromAddressService(OrganizationCommonService):
         super().__init__(organization_repo)
 
     async def __call__(
-        self, city: str, street: str, house_num: str
-    ) -> list[Organization]:
-        organization_names = (
-            await self._organization_repo.get_organizations_by_address_parts(
-                city, street, house_num
+        self,
+        city: str,
+        street: str,
+        house_num: str,
+        limit: int,
+        cursor: str | None = None,
+    ) -> OrganizationPage:
+        after_id = decode_cursor(cursor) if cursor else None
+        org_data_list = (
+            await self._organization_repo.get_organizations_full_info_by_address_parts(
+                city, street, house_num, limit=limit + 1, after_id=after_id
             )
         )
 
-        if not organization_names:
+        if not org_data_list and after_id is None:
             raise AddressNotFoundError
 
-        org_data_list = (
-            await self._organization_repo.get_organizations_full_info_by_names(
-                organization_names
-            )
+        return self._create_organizations_page(org_data_list, limit)
+
+
+class GetOrganizationsFromActivityService(ActivityCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> None:
+        super().__init__(organization_repo, activity_index)
+
+    async def __call__(
+        self, activity: str, limit: int, cursor: str | None = None
+    ) -> OrganizationPage:
+        after_id = decode_cursor(cursor) if cursor else None
+        org_data_list = await self._get_activity_organizations(
+            activity, include_descendants=False, limit=limit + 1, after_id=after_id
         )
 
-        return self._create_organizations_from_dict_list(org_data_list)
+        return self._create_organizations_page(org_data_list, limit)
 
 
-class GetOrganizationsFromActivityService(OrganizationCommonService):
+class GetOrganizationByIDService(OrganizationCommonService):
     def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
         super().__init__(organization_repo)
 
-    async def __call__(self, activity: str) -> list[Organization]:
-        if not await self._organization_repo.check_activity_exists(activity):
-            raise ActivityNotFoundError
+    async def __call__(self, org_id: UUID4) -> Organization:
+        org_info = await self._organization_repo.get_organization_full_info(org_id)
+        if not org_info:
+            raise OrganizationNotFoundError
+
+        return self._create_organization_from_dict(org_info)
 
-        organization_names = (
-            await self._organization_repo.get_all_organizations_from_activity(activity)
+
+class GetOrganizationsFromAncestorActivityService(ActivityCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> None:
+        super().__init__(organization_repo, activity_index)
+
+    async def __call__(
+        self, activity: str, limit: int, cursor: str | None = None
+    ) -> OrganizationPage:
+        after_id = decode_cursor(cursor) if cursor else None
+        org_data_list = await self._get_activity_organizations(
+            activity, include_descendants=True, limit=limit + 1, after_id=after_id
         )
 
-        if not organization_names:
-            return []
+        return self._create_organizations_page(org_data_list, limit)
 
+
+class GetOrganizationsFromGeoService(OrganizationCommonService):
+    def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
+        super().__init__(organization_repo)
+
+    async def __call__(
+        self,
+        latitude: float,
+        longitude: float,
+        radius: float,
+        limit: int,
+        cursor: str | None = None,
+    ) -> OrganizationPage:
+        after_id = decode_cursor(cursor) if cursor else None
         org_data_list = (
-            await self._organization_repo.get_organizations_full_info_by_names(
-                organization_names
+            await self._organization_repo.get_organizations_full_info_within_radius(
+                latitude, longitude, radius, limit=limit + 1, after_id=after_id
             )
         )
 
-        return self._create_organizations_from_dict_list(org_data_list)
+        return self._create_organizations_page(org_data_list, limit)
 
 
-class GetOrganizationByIDService:
+class GetNearestOrganizationsService(OrganizationCommonService):
     def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
-        self._organization_repo = organization_repo
-
-    async def __call__(self, org_id: UUID4) -> Organization:
-        org_info = await self._organization_repo.get_organization_full_info(org_id)
-        if not org_info:
-            raise OrganizationNotFoundError
-
-        address = Address(address=org_info["address"] or "", office=org_info["office"])
+        super().__init__(organization_repo)
 
-        return Organization(
-            name=org_info["name"],
-            phones_numbers=org_info["phones"],
-            address=address,
-            activities=org_info["activities"],
+    async def __call__(
+        self, latitude: float, longitude: float, k: int
+    ) -> list[OrganizationWithDistance]:
+        org_data_list = (
+            await self._organization_repo.get_nearest_organizations_full_info(
+                latitude, longitude, k
+            )
         )
 
+        return [
+            self._create_organization_from_dict(
+                org_data, OrganizationWithDistance, "distance"
+            )
+            for org_data in org_data_list
+        ]
+
 
-class GetOrganizationsFromAncestorActivityService(OrganizationCommonService):
+class GetOrganizationsInBoxService(OrganizationCommonService):
     def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
         super().__init__(organization_repo)
 
-    async def __call__(self, activity: str) -> list[Organization]:
-        if not await self._organization_repo.check_activity_exists(activity):
-            raise ActivityNotFoundError
+    async def __call__(
+        self, bbox: BoundingBox, limit: int, cluster: bool, grid_size: int
+    ) -> OrganizationsInBox:
+        total = await self._organization_repo.count_organizations_in_bbox(bbox)
+        if cluster and total > limit:
+            clusters = await self._organization_repo.get_organization_clusters_in_bbox(
+                bbox, grid_size
+            )
+            return OrganizationsInBox(
+                total=total,
+                organizations=[],
+                clusters=[GridCluster(**cluster_data) for cluster_data in clusters],
+            )
 
-        organization_names = await self._organization_repo.get_organizations_by_ancestor_activity_optimized(
-            activity
+        org_data_list = (
+            await self._organization_repo.get_organizations_full_info_in_bbox(
+                bbox, limit
+            )
+        )
+        return OrganizationsInBox(
+            total=total,
+            organizations=self._create_organizations_from_dict_list(org_data_list),
+            clusters=[],
         )
 
-        if not organization_names:
-            return []
+
+class SearchOrganizationsService(OrganizationCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, statement_timeout: int
+    ) -> None:
+        super().__init__(organization_repo)
+        self._statement_timeout = statement_timeout
+
+    async def __call__(self, query: str, limit: int) -> list[OrganizationWithRank]:
+        org_data_list = await self._organization_repo.search_organizations_full_info(
+            query, limit, self._statement_timeout
+        )
+
+        return [
+            self._create_organization_from_dict(org_data, OrganizationWithRank, "rank")
+            for org_data in org_data_list
+        ]
+
+
+class GetOrganizationsBatchService(OrganizationCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, max_size: int
+    ) -> None:
+        super().__init__(organization_repo)
+        self._max_size = max_size
+
+    async def __call__(
+        self, batch: OrganizationBatchRequest
+    ) -> list[OrganizationBatchItem]:
+        if len(batch.ids) + len(batch.names) > self._max_size:
+            raise BatchTooLargeError
 
         org_data_list = (
-            await self._organization_repo.get_organizations_full_info_by_names(
-                organization_names
+            await self._organization_repo.get_organizations_full_info_by_ids_and_names(
+                list(set(batch.ids)), list(set(batch.names))
             )
         )
-
-        return self._create_organizations_from_dict_list(org_data_list)
+        by_id = {org_data["id"]: org_data for org_data in org_data_list}
+        by_name = {org_data["name"]: org_data for org_data in org_data_list}
+
+        return [
+            self._create_batch_item(str(org_id), by_id.get(org_id))
+            for org_id in batch.ids
+        ] + [self._create_batch_item(name, by_name.get(name)) for name in batch.names]
+
+    def _create_batch_item(
+        self, query: str, org_data: dict | None
+    ) -> OrganizationBatchItem:
+        if org_data is None:
+            return OrganizationBatchItem(query=query, found=False)
+        return OrganizationBatchItem(
+            query=query,
+            found=True,
+            organization=self._create_organization_from_dict(org_data),
+        )
 
 
-class GetOrganizationsFromGeoService(OrganizationCommonService):
+class StreamOrganizationsFromAddressService(OrganizationCommonService):
     def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
         super().__init__(organization_repo)
 
     async def __call__(
-        self, latitude: float, longitude: float, radius: float
-    ) -> list[Organization]:
-        organization_names = (
-            await self._organization_repo.get_organizations_within_radius(
-                latitude, longitude, radius
+        self, city: str, street: str, house_num: str
+    ) -> AsyncIterator[Organization]:
+        org_data_stream = (
+            self._organization_repo.stream_organizations_full_info_by_address_parts(
+                city, street, house_num
             )
         )
 
-        if not organization_names:
-            return []
+        try:
+            first = await org_data_stream.__anext__()
+        except StopAsyncIteration:
+            raise AddressNotFoundError
 
-        org_data_list = (
-            await self._organization_repo.get_organizations_full_info_by_names(
-                organization_names
+        return self._create_organizations_stream(org_data_stream, first)
+
+
+class StreamOrganizationsFromActivityService(ActivityCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> None:
+        super().__init__(organization_repo, activity_index)
+
+    async def __call__(self, activity: str) -> AsyncIterator[Organization]:
+        activity_names = await self._get_activity_names(
+            activity, include_descendants=False
+        )
+
+        return self._create_organizations_stream(
+            self._organization_repo.stream_organizations_full_info_by_activities(
+                activity_names
             )
         )
 
-        return self._create_organizations_from_dict_list(org_data_list)
+
+class StreamOrganizationsFromAncestorActivityService(ActivityCommonService):
+    def __init__(
+        self, organization_repo: OrganizationRepoProtocol, activity_index: ActivityIndex
+    ) -> None:
+        super().__init__(organization_repo, activity_index)
+
+    async def __call__(self, activity: str) -> AsyncIterator[Organization]:
+        activity_names = await self._get_activity_names(
+            activity, include_descendants=True
+        )
+
+        return self._create_organizations_stream(
+            self._organization_repo.stream_organizations_full_info_by_activities(
+                activity_names
+            )
+        )
+
+
+class StreamOrganizationsFromGeoService(OrganizationCommonService):
+    def __init__(self, organization_repo: OrganizationRepoProtocol) -> None:
+        super().__init__(organization_repo)
+
+    async def __call__(
+        self, latitude: float, longitude: float, radius: float
+    ) -> AsyncIterator[Organization]:
+        return self._create_organizations_stream(
+            self._organization_repo.stream_organizations_full_info_within_radius(
+                latitude, longitude, radius
+            )
+        )
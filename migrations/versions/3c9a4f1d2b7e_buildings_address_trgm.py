@@ -0,0 +1,36 @@
+"""buildings address trigram index
+
+Revision ID: 3c9a4f1d2b7e
+Revises: 8bfc6c7fff9b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a4f1d2b7e"
+down_revision: Union[str, None] = "8bfc6c7fff9b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "idx_buildings_address_trgm",
+        "buildings",
+        ["address"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"address": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    # the pg_trgm extension is left installed, other objects may depend on it
+    op.drop_index(
+        "idx_buildings_address_trgm", table_name="buildings", postgresql_using="gin"
+    )
@@ -0,0 +1,55 @@
+"""organizations name search indexes
+
+Revision ID: 7e2b5d8a1c43
+Revises: 3c9a4f1d2b7e
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7e2b5d8a1c43"
+down_revision: Union[str, None] = "3c9a4f1d2b7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "idx_organizations_name_tsvector",
+        "organizations",
+        [
+            sa.text(
+                "(to_tsvector('russian'::regconfig, name) "
+                "|| to_tsvector('english'::regconfig, name))"
+            )
+        ],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "idx_organizations_name_trgm",
+        "organizations",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_organizations_name_trgm",
+        table_name="organizations",
+        postgresql_using="gin",
+    )
+    op.drop_index(
+        "idx_organizations_name_tsvector",
+        table_name="organizations",
+        postgresql_using="gin",
+    )
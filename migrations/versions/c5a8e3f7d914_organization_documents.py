@@ -0,0 +1,100 @@
+"""organization documents read model
+
+Revision ID: c5a8e3f7d914
+Revises: 7e2b5d8a1c43
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a8e3f7d914"
+down_revision: Union[str, None] = "7e2b5d8a1c43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW organization_documents AS
+        SELECT
+            organizations.id,
+            organizations.name,
+            buildings.address,
+            buildings.office,
+            buildings.location,
+            coalesce(
+                array_agg(DISTINCT phones.phone_number)
+                    FILTER (WHERE phones.phone_number IS NOT NULL),
+                '{}'
+            ) AS phones,
+            coalesce(
+                array_agg(DISTINCT activities.name)
+                    FILTER (WHERE activities.name IS NOT NULL),
+                '{}'
+            ) AS activities
+        FROM organizations
+        LEFT JOIN buildings ON buildings.id = organizations.building_id
+        LEFT JOIN organization_phones
+            ON organization_phones.organization_id = organizations.id
+        LEFT JOIN phones ON phones.id = organization_phones.phone_number_id
+        LEFT JOIN organization_activities
+            ON organization_activities.organization_id = organizations.id
+        LEFT JOIN activities ON activities.id = organization_activities.activity_id
+        GROUP BY organizations.id, buildings.id
+        WITH DATA
+        """
+    )
+    # the unique index on id is required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.create_index(
+        "idx_organization_documents_id", "organization_documents", ["id"], unique=True
+    )
+    op.create_index(
+        "idx_organization_documents_name",
+        "organization_documents",
+        ["name"],
+        unique=True,
+    )
+    op.create_index(
+        "idx_organization_documents_location",
+        "organization_documents",
+        ["location"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.create_index(
+        "idx_organization_documents_address_trgm",
+        "organization_documents",
+        ["address"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"address": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "idx_organization_documents_activities",
+        "organization_documents",
+        ["activities"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    # addresses are only searched in the read model now, the index on the
+    # normalized table would only slow down writes and vacuum
+    op.drop_index(
+        "idx_buildings_address_trgm", table_name="buildings", postgresql_using="gin"
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        "idx_buildings_address_trgm",
+        "buildings",
+        ["address"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"address": "gin_trgm_ops"},
+    )
+    op.execute("DROP MATERIALIZED VIEW organization_documents")
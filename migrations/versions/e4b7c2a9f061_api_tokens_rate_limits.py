@@ -0,0 +1,49 @@
+"""api tokens rate limits
+
+Revision ID: e4b7c2a9f061
+Revises: c5a8e3f7d914
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b7c2a9f061"
+down_revision: Union[str, None] = "c5a8e3f7d914"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "api_tokens",
+        sa.Column("rate_limit", sa.Integer(), server_default="100", nullable=False),
+    )
+    op.add_column(
+        "api_tokens",
+        sa.Column("rate_window", sa.Integer(), server_default="3600", nullable=False),
+    )
+    op.add_column(
+        "api_tokens",
+        sa.Column("burst", sa.Integer(), server_default="100", nullable=False),
+    )
+    op.create_check_constraint(
+        "api_tokens_rate_limit_check", "api_tokens", "rate_limit > 0"
+    )
+    op.create_check_constraint(
+        "api_tokens_rate_window_check", "api_tokens", "rate_window > 0"
+    )
+    op.create_check_constraint("api_tokens_burst_check", "api_tokens", "burst >= 1")
+
+
+def downgrade() -> None:
+    op.drop_constraint("api_tokens_burst_check", "api_tokens", type_="check")
+    op.drop_constraint("api_tokens_rate_window_check", "api_tokens", type_="check")
+    op.drop_constraint("api_tokens_rate_limit_check", "api_tokens", type_="check")
+    op.drop_column("api_tokens", "burst")
+    op.drop_column("api_tokens", "rate_window")
+    op.drop_column("api_tokens", "rate_limit")
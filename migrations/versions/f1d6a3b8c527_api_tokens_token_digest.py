@@ -0,0 +1,47 @@
+"""api tokens token digest
+
+Revision ID: f1d6a3b8c527
+Revises: e4b7c2a9f061
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1d6a3b8c527"
+down_revision: Union[str, None] = "e4b7c2a9f061"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "api_tokens", sa.Column("token_digest", sa.LargeBinary(32), nullable=True)
+    )
+    op.add_column("api_tokens", sa.Column("token_prefix", sa.String(8), nullable=True))
+    op.execute(
+        "UPDATE api_tokens "
+        "SET token_digest = sha256(convert_to(token, 'UTF8')), "
+        "token_prefix = left(token, 8)"
+    )
+    op.alter_column("api_tokens", "token_digest", nullable=False)
+    op.alter_column("api_tokens", "token_prefix", nullable=False)
+    op.create_unique_constraint(
+        "api_tokens_token_digest_key", "api_tokens", ["token_digest"]
+    )
+    op.drop_column("api_tokens", "token")
+
+
+def downgrade() -> None:
+    # the raw tokens cannot be restored from their digests, the downgraded
+    # tokens get the hex digest instead and have to be issued again
+    op.add_column("api_tokens", sa.Column("token", sa.String(), nullable=True))
+    op.execute("UPDATE api_tokens SET token = encode(token_digest, 'hex')")
+    op.alter_column("api_tokens", "token", nullable=False)
+    op.create_unique_constraint("api_tokens_token_key", "api_tokens", ["token"])
+    op.drop_column("api_tokens", "token_prefix")
+    op.drop_column("api_tokens", "token_digest")
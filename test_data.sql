@@ -153,4 +153,6 @@ VALUES
     ((SELECT id FROM organizations WHERE name = 'ИП Moscow Dynamics'), (SELECT id FROM activities WHERE name = 'Спорттовары')),
     ((SELECT id FROM organizations WHERE name = 'ИП Innovatech Solutions'), (SELECT id FROM activities WHERE name = 'Композитные спорттовары'));
 
+REFRESH MATERIALIZED VIEW organization_documents;
+
 COMMIT;
\ No newline at end of file
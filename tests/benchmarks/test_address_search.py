@@ -0,0 +1,88 @@
+import json
+from os import environ as env
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.repositories.organization_repo import OrganizationRepo
+
+pytestmark = pytest.mark.skipif(
+    not env.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks"
+)
+
+BUILDINGS = 1_000_000
+ADDRESS_INDEX = "idx_organization_documents_address_trgm"
+
+
+async def explain_address_search(
+    connection: AsyncConnection, city: str, street: str, house_num: str
+) -> tuple[float, str]:
+    query = OrganizationRepo._full_info_query(
+        OrganizationRepo._address_filter(
+            OrganizationRepo._address_pattern(city, street, house_num)
+        )
+    ).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"))
+    plan: Any = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Execution Time"], json.dumps(plan[0]["Plan"])
+
+
+@pytest.mark.asyncio
+async def test_address_search_uses_trigram_index(async_engine: AsyncEngine) -> None:
+    """Compares the address search with and without the trigram index.
+
+    Addresses are searched in the organization_documents read model, so the
+    measured index is the one of the view, buildings has no address index.
+
+    The synthetic buildings and their organizations are inserted and the
+    organization_documents read model is refreshed in a transaction that is
+    rolled back, the index is dropped inside the same transaction for the
+    second measurement, so the database is left as it was.
+    """
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        try:
+            await connection.execute(
+                text(
+                    "INSERT INTO buildings (address, office, location) "
+                    "SELECT format('г. Город-%s, ул. Улица-%s %s', "
+                    "i % 1000, (i / 1000) % 100, i % 200), 1, "
+                    "ST_SetSRID(ST_MakePoint(37.6, 55.75), 4326) "
+                    "FROM generate_series(1, :buildings) AS i"
+                ),
+                {"buildings": BUILDINGS},
+            )
+            await connection.execute(
+                text(
+                    "INSERT INTO organizations (name, building_id) "
+                    "SELECT 'Организация ' || id, id FROM buildings "
+                    "WHERE address LIKE 'г. Город-%'"
+                )
+            )
+            await connection.execute(
+                text("REFRESH MATERIALIZED VIEW organization_documents")
+            )
+            await connection.execute(text("ANALYZE organization_documents"))
+
+            indexed_time, indexed_plan = await explain_address_search(
+                connection, "Город-123", "Улица-45", "123"
+            )
+            await connection.execute(text(f"DROP INDEX {ADDRESS_INDEX}"))
+            seq_scan_time, seq_scan_plan = await explain_address_search(
+                connection, "Город-123", "Улица-45", "123"
+            )
+        finally:
+            await transaction.rollback()
+
+    print(
+        f"\naddress search over {BUILDINGS} buildings: ILIKE without index "
+        f"{seq_scan_time:.1f} ms, with trigram index {indexed_time:.1f} ms "
+        f"({seq_scan_time / indexed_time:.1f}x)"
+    )
+    assert ADDRESS_INDEX in indexed_plan
+    assert ADDRESS_INDEX not in seq_scan_plan
+    assert indexed_time < seq_scan_time
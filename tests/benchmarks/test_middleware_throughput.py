@@ -0,0 +1,119 @@
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from os import environ as env
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from httpx import ASGITransport, AsyncClient
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp
+
+from app.core.cache import TokenCache
+from app.core.models.pydantic_models import Address, Organization
+from app.core.utils import hash_token
+from app.middleware.check_token_valid import CheckTokenMiddleware
+from app.middleware.logger import LoggerMiddleware
+
+pytestmark = pytest.mark.skipif(
+    not env.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks"
+)
+
+TOKEN = "benchmark-token"
+REQUESTS = 2000
+# the pure ASGI middlewares must not be slower than the BaseHTTPMiddleware ones,
+# with some room for the noise of a single run
+TOLERANCE = 0.9
+
+
+class BaseHTTPCheckTokenMiddleware(BaseHTTPMiddleware):
+    """The token check wrapped the way it was before the pure ASGI rewrite."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        super().__init__(app)
+        self._checker = CheckTokenMiddleware(app)
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        error_response = await self._checker.check_request(request)
+        return error_response or await call_next(request)
+
+
+class BaseHTTPLoggerMiddleware(BaseHTTPMiddleware):
+    """The request logging wrapped the way it was before the pure ASGI rewrite."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        super().__init__(app)
+        self._logger = LoggerMiddleware(app)
+
+    async def dispatch(
+        self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        start_time = time.time()
+        response = await call_next(request)
+        self._logger.log_request(
+            request,
+            response.status_code,
+            int(response.headers.get("content-length", 0)),
+            time.time() - start_time,
+        )
+        return response
+
+
+def build_app(
+    logger_middleware: Callable[[ASGIApp], ASGIApp],
+    check_token_middleware: Callable[[ASGIApp], ASGIApp],
+) -> FastAPI:
+    app = FastAPI()
+    app.state.db_connection = None
+    app.state.token_cache = TokenCache(max_size=10, ttl=3600)
+    app.state.token_cache.put(hash_token(TOKEN), 10**9, datetime.now(timezone.utc))
+
+    @app.get("/organization/name", response_model=Organization)
+    async def get_organization_by_name(name: str) -> Organization:
+        return Organization(
+            name=name,
+            phones_numbers=["2-222-222"],
+            address=Address(address="г. Москва, ул. Ленина 1", office=1),
+            activities=["Еда"],
+        )
+
+    app.add_middleware(logger_middleware)
+    app.add_middleware(check_token_middleware)
+    return app
+
+
+async def measure_requests_per_second(app: FastAPI) -> float:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport,
+        base_url="http://testserver",
+        headers={"Authorization": f"Bearer {TOKEN}"},
+    ) as client:
+        start_time = time.perf_counter()
+        for _ in range(REQUESTS):
+            response = await client.get(
+                "/organization/name", params={"name": "ООО Рога и Копыта"}
+            )
+            assert response.status_code == 200
+        return REQUESTS / (time.perf_counter() - start_time)
+
+
+@pytest.mark.asyncio
+async def test_middleware_throughput() -> None:
+    before = await measure_requests_per_second(
+        build_app(BaseHTTPLoggerMiddleware, BaseHTTPCheckTokenMiddleware)
+    )
+    after = await measure_requests_per_second(
+        build_app(LoggerMiddleware, CheckTokenMiddleware)
+    )
+
+    print(
+        f"\n/organization/name: BaseHTTPMiddleware {before:.0f} req/s, "
+        f"pure ASGI {after:.0f} req/s ({after / before:.2f}x)"
+    )
+    assert after >= before * TOLERANCE, (
+        f"pure ASGI middlewares handled {after:.0f} req/s, "
+        f"BaseHTTPMiddleware ones {before:.0f} req/s"
+    )
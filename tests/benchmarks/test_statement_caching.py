@@ -0,0 +1,137 @@
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from os import environ as env
+from typing import Any
+
+import pytest
+from sqlalchemy import Executable, text
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.configs import all_settings
+from app.repositories.organization_repo import OrganizationRepo
+
+pytestmark = pytest.mark.skipif(
+    not env.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks"
+)
+
+CALLS = 5000
+DB_CALLS = 500
+ACTIVITIES = ["Еда", "Мясная продукция", "Молочная продукция"]
+
+
+class EmptyResult:
+    def fetchall(self) -> list:
+        return []
+
+
+class CompilingSession:
+    """Does the statement work of an execution without a database.
+
+    Like a real connection it looks the statement up in the compiled cache by
+    its cache key and extracts the parameters, so only the database round trip
+    is left out.
+    """
+
+    def __init__(self, dialect: Dialect) -> None:
+        self._dialect = dialect
+        self._compiled_cache: dict[Any, Any] = {}
+
+    async def execute(self, statement: Executable) -> EmptyResult:
+        statement._compile_w_cache(  # type: ignore[attr-defined]
+            self._dialect, compiled_cache=self._compiled_cache, column_keys=[]
+        )
+        return EmptyResult()
+
+
+async def time_calls(call: Callable[[], Awaitable[Any]], calls: int) -> float:
+    await call()
+    start = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+@pytest.mark.asyncio
+async def test_lambda_statements_cut_python_overhead() -> None:
+    # the engine is only used for its dialect and never connects
+    session = CompilingSession(
+        create_async_engine(all_settings.database.db_uri).dialect
+    )
+    repo = OrganizationRepo(session)  # type: ignore[arg-type]
+    after_id = uuid.uuid4()
+
+    async def rebuilt_select() -> None:
+        # how every read was built before: a new select() construct per call
+        await session.execute(
+            OrganizationRepo._paginate(
+                OrganizationRepo._full_info_query(
+                    OrganizationRepo._activities_filter(ACTIVITIES)
+                ),
+                limit=50,
+                after_id=after_id,
+            )
+        )
+
+    async def lambda_statement() -> None:
+        await repo.get_organizations_full_info_by_activities(
+            ACTIVITIES, limit=50, after_id=after_id
+        )
+
+    rebuilt_time = await time_calls(rebuilt_select, CALLS)
+    lambda_time = await time_calls(lambda_statement, CALLS)
+
+    print(
+        f"\nstatement overhead per call: rebuilt select() {rebuilt_time:.1f} us, "
+        f"lambda statement {lambda_time:.1f} us "
+        f"({rebuilt_time / lambda_time:.1f}x)"
+    )
+    assert lambda_time < rebuilt_time
+
+
+async def time_db_calls(prepare_threshold: int | None) -> tuple[float, int]:
+    engine = create_async_engine(
+        all_settings.database.db_uri,
+        connect_args={"prepare_threshold": prepare_threshold},
+    )
+    try:
+        async with engine.connect() as connection:
+            repo = OrganizationRepo(AsyncSession(bind=connection))
+            call_time = await time_calls(
+                lambda: repo.get_organizations_full_info_by_activities(
+                    ACTIVITIES, limit=50
+                ),
+                DB_CALLS,
+            )
+            prepared = (
+                await connection.execute(
+                    text("SELECT count(*) FROM pg_prepared_statements")
+                )
+            ).scalar_one()
+    finally:
+        await engine.dispose()
+    return call_time, prepared
+
+
+@pytest.mark.asyncio
+async def test_prepared_statements_skip_planning() -> None:
+    """Runs the same activity page query with and without server-side prepares.
+
+    With a prepare threshold of 0 psycopg prepares the statement on its first
+    execution, so the later calls skip parsing and, once Postgres settles on a
+    generic plan, planning as well, which has to make each call faster.
+    """
+    unprepared_time, unprepared = await time_db_calls(None)
+    prepared_time, prepared = await time_db_calls(0)
+
+    print(
+        f"\nactivity page query over {DB_CALLS} calls: unprepared "
+        f"{unprepared_time:.1f} us, prepared {prepared_time:.1f} us per call"
+    )
+    assert unprepared == 0
+    assert prepared > 0
+    assert prepared_time < unprepared_time, (
+        f"prepared statements took {prepared_time:.1f} us per call, "
+        f"unprepared ones {unprepared_time:.1f} us"
+    )
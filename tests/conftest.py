@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.pool import NullPool
 
 from app.core.configs import all_settings
+from app.core.utils import TOKEN_PREFIX_LENGTH
 from app.main import setup_app
 
 
@@ -30,7 +31,9 @@ async def async_engine() -> AsyncIterator[AsyncEngine]:
 
 
 @pytest.fixture(scope="session")
-async def register_token(async_client: AsyncClient) -> AsyncGenerator[str, None]:
+async def register_token(
+    async_client: AsyncClient,
+) -> AsyncGenerator[tuple[str, str], None]:
     random_login = "".join(
         random.choice(string.ascii_letters + string.digits) for _ in range(10)
     )
@@ -45,15 +48,16 @@ async def register_token(async_client: AsyncClient) -> AsyncGenerator[str, None]
         f"Response: {login_response.text}"
     )
 
-    yield random_login
+    yield random_login, login_response.json()
 
 
 @pytest.fixture(scope="session")
 async def authenticated_token(
-    async_client: AsyncClient, register_token: str
+    async_client: AsyncClient, register_token: tuple[str, str]
 ) -> AsyncGenerator[str, None]:
+    login, api_key_token = register_token
     login_response = await async_client.get(
-        "/api_token/tokens", params={"login": register_token}
+        "/api_token/tokens", params={"login": login}
     )
 
     assert login_response.status_code == 200, (
@@ -65,8 +69,11 @@ async def authenticated_token(
 
     assert response_json, "No tokens found in response"
 
-    api_key_token = response_json[0].get("token")
-    assert api_key_token, "API key token not found in response"
+    # only the prefix of a token is stored, the token itself is returned once
+    token_prefix = response_json[0].get("token_prefix")
+    assert (
+        token_prefix == api_key_token[:TOKEN_PREFIX_LENGTH]
+    ), "API key token not found in response"
 
     yield api_key_token
 
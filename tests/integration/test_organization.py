@@ -1,3 +1,5 @@
+import uuid
+
 import pytest
 from httpx import AsyncClient
 
@@ -54,3 +56,174 @@ async def test_get_organizations_by_address(set_auth_headers: AsyncClient) -> No
             "phones_numbers" in org
         ), "Organization should have a 'phones_numbers' field"
         assert "activities" in org, "Organization should have an 'activities' field"
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_by_ancestor_activity_pages(
+    set_auth_headers: AsyncClient,
+) -> None:
+    params = {"activity": "Еда"}
+
+    response = await set_auth_headers.get(
+        "/organization/ancestor/activity", params=params
+    )
+    assert response.status_code == 200, response.text
+    all_names = {org["name"] for org in response.json()}
+
+    paged_names: list[str] = []
+    cursor = None
+    while True:
+        page_params: dict[str, str | int] = {**params, "limit": 1}
+        if cursor:
+            page_params["cursor"] = cursor
+        response = await set_auth_headers.get(
+            "/organization/ancestor/activity", params=page_params
+        )
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= 1, f"Expected at most 1 organization, but got {len(page)}"
+        paged_names.extend(org["name"] for org in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(paged_names) == len(set(paged_names)), "Pages should not overlap"
+    assert set(paged_names) == all_names, "Pages should cover all organizations"
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_with_invalid_cursor(
+    set_auth_headers: AsyncClient,
+) -> None:
+    response = await set_auth_headers.get(
+        "/organization/activity", params={"activity": "Еда", "cursor": "bad cursor"}
+    )
+
+    assert response.status_code == 400, (
+        f"Expected status code 400, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+
+@pytest.mark.parametrize(
+    "path", ["/organization/activity", "/organization/ancestor/activity"]
+)
+@pytest.mark.asyncio
+async def test_get_organizations_by_unknown_activity(
+    set_auth_headers: AsyncClient, path: str
+) -> None:
+    response = await set_auth_headers.get(path, params={"activity": "Несуществующая"})
+
+    assert response.status_code == 404, (
+        f"Expected status code 404, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_nearest_organizations(set_auth_headers: AsyncClient) -> None:
+    params = {"latitude": 55.75396, "longitude": 37.620393, "k": 4}
+
+    response = await set_auth_headers.get("/organization/nearest", params=params)
+
+    assert response.status_code == 200, (
+        f"Expected status code 200, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+    response_json = response.json()
+
+    assert (
+        len(response_json) == 4
+    ), f"Expected 4 organizations, got {len(response_json)}"
+    distances = [org["distance"] for org in response_json]
+    assert distances == sorted(distances), "Organizations should be ordered by distance"
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_in_box(set_auth_headers: AsyncClient) -> None:
+    params = {
+        "min_latitude": 55.7,
+        "min_longitude": 37.5,
+        "max_latitude": 55.8,
+        "max_longitude": 37.7,
+    }
+
+    response = await set_auth_headers.get("/organization/bbox", params=params)
+
+    assert response.status_code == 200, (
+        f"Expected status code 200, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+    response_json = response.json()
+
+    assert response_json["total"] > 1, "Expected several organizations in Moscow"
+    assert len(response_json["organizations"]) == response_json["total"]
+    assert response_json["clusters"] == []
+
+    response = await set_auth_headers.get(
+        "/organization/bbox", params={**params, "limit": 1, "cluster": True}
+    )
+
+    assert response.status_code == 200, (
+        f"Expected status code 200, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+    clustered_json = response.json()
+
+    assert clustered_json["organizations"] == []
+    assert (
+        sum(cluster["count"] for cluster in clustered_json["clusters"])
+        == clustered_json["total"]
+    ), "Cluster counts should add up to the total"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "query, expected_name",
+    [
+        ("рога копыта", "ООО Рога и Копыта"),
+        ("Колбаскен", "ИП Колбаскин"),
+    ],
+)
+async def test_search_organizations(
+    set_auth_headers: AsyncClient, query: str, expected_name: str
+) -> None:
+    response = await set_auth_headers.get("/organization/search", params={"q": query})
+
+    assert response.status_code == 200, (
+        f"Expected status code 200, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+    response_json = response.json()
+
+    assert response_json, f"Expected results for {query!r}"
+    assert response_json[0]["name"] == expected_name
+    ranks = [org["rank"] for org in response_json]
+    assert ranks == sorted(ranks, reverse=True), "Results should be ordered by rank"
+
+
+@pytest.mark.asyncio
+async def test_get_organizations_batch(set_auth_headers: AsyncClient) -> None:
+    missing_id = str(uuid.uuid4())
+    batch = {
+        "ids": [missing_id],
+        "names": ["ИП Колбаскин", "ООО Несуществующая", "ООО Рога и Копыта"],
+    }
+
+    response = await set_auth_headers.post("/organization/batch", json=batch)
+
+    assert response.status_code == 200, (
+        f"Expected status code 200, but got {response.status_code}. "
+        f"Response: {response.text}"
+    )
+
+    response_json = response.json()
+
+    assert [item["query"] for item in response_json] == [missing_id, *batch["names"]]
+    assert [item["found"] for item in response_json] == [False, True, False, True]
+    assert response_json[1]["organization"]["name"] == "ИП Колбаскин"
+    assert response_json[2]["organization"] is None
@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.configs.settings import RateLimitSettings, TokenCacheSettings
+from app.core.models.sqlalchemy_models import ApiTokens
+from app.core.utils import hash_token
+from app.repositories.token_repo import TokenRepo
+
+LIMIT = 10
+PARALLEL_REQUESTS = 50
+
+
+async def issue_token(async_engine: AsyncEngine, limit: int) -> str:
+    async with AsyncSession(async_engine) as session:
+        token_repo = TokenRepo(session)
+        user_id = await token_repo.insert_user(f"quota-{uuid.uuid4().hex[:10]}")
+        token = await token_repo.insert_api_token(
+            user_id, token_repo.generate_api_token()
+        )
+        await session.execute(
+            update(ApiTokens)
+            .where(ApiTokens.token_digest == hash_token(token))
+            .values(limit=limit)
+        )
+        await session.commit()
+    return token
+
+
+async def consume(async_engine: AsyncEngine, token: str) -> bool | None:
+    async with AsyncSession(async_engine) as session:
+        consumed = await TokenRepo(session).consume_token_limit(hash_token(token))
+        await session.commit()
+    return consumed[0] if consumed else None
+
+
+@pytest.mark.asyncio
+async def test_parallel_requests_are_not_over_admitted(
+    async_engine: AsyncEngine,
+) -> None:
+    token = await issue_token(async_engine, LIMIT)
+
+    results = await asyncio.gather(
+        *(consume(async_engine, token) for _ in range(PARALLEL_REQUESTS))
+    )
+
+    assert results.count(True) == LIMIT, f"Admitted {results.count(True)} requests"
+    assert results.count(False) == PARALLEL_REQUESTS - LIMIT
+
+    async with AsyncSession(async_engine) as session:
+        remaining = (
+            await session.execute(
+                select(ApiTokens.limit).where(
+                    ApiTokens.token_digest == hash_token(token)
+                )
+            )
+        ).scalar_one()
+    assert remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_unknown_token_is_not_admitted(async_engine: AsyncEngine) -> None:
+    assert await consume(async_engine, "unknown-token") is None
+
+
+@pytest.mark.asyncio
+async def test_default_configuration_does_not_over_admit(
+    async_client: AsyncClient, async_engine: AsyncEngine
+) -> None:
+    assert TokenCacheSettings.model_fields["enabled"].default is False
+    assert RateLimitSettings.model_fields["algorithm"].default == "fixed_window"
+    token = await issue_token(async_engine, LIMIT)
+
+    responses = await asyncio.gather(
+        *(
+            async_client.get(
+                "/organization/name",
+                params={"name": "ООО Рога и Копыта"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            for _ in range(PARALLEL_REQUESTS)
+        )
+    )
+
+    status_codes = [response.status_code for response in responses]
+    assert status_codes.count(400) == PARALLEL_REQUESTS - LIMIT, status_codes
@@ -0,0 +1,60 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.cache import ActivityIndex, ActivityTree
+
+FOOD, MEAT, DRINKS, JUICES = (uuid.uuid4() for _ in range(4))
+
+ROWS = [
+    {"id": FOOD, "name": "Еда", "ancestor_ids": [FOOD]},
+    {"id": MEAT, "name": "Мясная продукция", "ancestor_ids": [FOOD, MEAT]},
+    {"id": DRINKS, "name": "Напитки", "ancestor_ids": [FOOD, DRINKS]},
+    {"id": JUICES, "name": "Соки", "ancestor_ids": [FOOD, DRINKS, JUICES]},
+]
+
+
+def test_tree_resolves_descendants_and_depth() -> None:
+    tree = ActivityTree.from_rows(ROWS)
+
+    assert tree.get_id("Напитки") == DRINKS
+    assert tree.get_descendant_names("Напитки") == ["Напитки", "Соки"]
+    assert tree.get_descendant_names("Еда") == [
+        "Еда",
+        "Мясная продукция",
+        "Напитки",
+        "Соки",
+    ]
+    assert tree.get_descendant_names("Соки") == ["Соки"]
+    assert tree.get_depth("Еда") == 0
+    assert tree.get_depth("Соки") == 2
+
+
+def test_tree_returns_none_for_unknown_activity() -> None:
+    tree = ActivityTree.from_rows(ROWS)
+
+    assert tree.get_id("Спорттовары") is None
+    assert tree.get_descendant_names("Спорттовары") is None
+    assert tree.get_depth("Спорттовары") is None
+
+
+@pytest.mark.asyncio
+async def test_index_loads_once_until_invalidated() -> None:
+    index = ActivityIndex()
+    loads = 0
+
+    async def loader() -> list[dict]:
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0)
+        return ROWS
+
+    trees = await asyncio.gather(*(index.get_tree(loader) for _ in range(5)))
+    assert loads == 1
+    assert all(tree is trees[0] for tree in trees)
+
+    index.invalidate()
+    await index.get_tree(loader)
+    await index.get_tree(loader)
+    assert loads == 2
@@ -0,0 +1,19 @@
+import hashlib
+
+from app.core.utils import TOKEN_PREFIX_LENGTH, get_token_prefix, hash_token
+
+
+def test_hash_token_is_sha256_digest() -> None:
+    digest = hash_token("token")
+
+    assert digest == hashlib.sha256(b"token").digest()
+    assert len(digest) == 32
+    assert hash_token("token") == digest
+    assert hash_token("other") != digest
+
+
+def test_token_prefix_is_kept_for_display() -> None:
+    token = "abcdefghijklmnop"
+
+    assert get_token_prefix(token) == token[:TOKEN_PREFIX_LENGTH]
+    assert len(get_token_prefix(token)) == TOKEN_PREFIX_LENGTH
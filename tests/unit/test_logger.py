@@ -0,0 +1,107 @@
+import io
+import json
+import logging
+import queue
+
+from pythonjsonlogger import jsonlogger
+
+from app.core.utils.logger import (
+    BatchingQueueListener,
+    BoundedQueueHandler,
+    SuccessSampler,
+)
+
+
+def make_record(message: str, **extra: object) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class CountingStream(io.StringIO):
+    writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def test_full_queue_drops_new_records() -> None:
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, "drop_new")
+    for message in ["a", "b", "c"]:
+        handler.handle(make_record(message))
+
+    assert [log_queue.get_nowait().msg for _ in range(2)] == ["a", "b"]
+    assert handler.dropped == 1
+
+
+def test_full_queue_drops_oldest_records() -> None:
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = BoundedQueueHandler(log_queue, "drop_oldest")
+    for message in ["a", "b", "c"]:
+        handler.handle(make_record(message))
+
+    assert [log_queue.get_nowait().msg for _ in range(2)] == ["b", "c"]
+    assert handler.dropped == 1
+
+
+def test_sampler_only_drops_successful_requests() -> None:
+    sampler = SuccessSampler(rate=0)
+
+    assert not sampler.filter(make_record("ok", response_status=200))
+    assert sampler.filter(make_record("error", response_status=500))
+    assert sampler.filter(make_record("startup"))
+
+
+def test_listener_writes_batches_and_reports_drops() -> None:
+    log_queue: queue.Queue = queue.Queue(maxsize=3)
+    queue_handler = BoundedQueueHandler(log_queue, "drop_new")
+    stream = CountingStream()
+    stream_handler = logging.StreamHandler(stream)
+    listener = BatchingQueueListener(
+        log_queue, queue_handler, [stream_handler], batch_size=10
+    )
+    for message in ["a", "b", "c", "d"]:
+        queue_handler.handle(make_record(message))
+
+    listener.start()
+    listener.stop()
+
+    assert stream.getvalue().splitlines() == [
+        "a",
+        "b",
+        "c",
+        "1 log records were dropped because the log queue was full",
+    ]
+    assert stream.writes == 1
+
+
+def test_exception_reaches_json_formatter_apart_from_message() -> None:
+    log_queue: queue.Queue = queue.Queue()
+    queue_handler = BoundedQueueHandler(log_queue)
+    stream = io.StringIO()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(jsonlogger.JsonFormatter("%(levelname)s %(message)s"))
+    listener = BatchingQueueListener(
+        log_queue, queue_handler, [stream_handler], batch_size=10
+    )
+    test_logger = logging.getLogger("test_logger_exception")
+    test_logger.propagate = False
+    test_logger.addHandler(queue_handler)
+    try:
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            test_logger.exception("Failed to handle %s", "request")
+    finally:
+        test_logger.removeHandler(queue_handler)
+
+    listener.start()
+    listener.stop()
+
+    logged = json.loads(stream.getvalue())
+    assert logged["levelname"] == "ERROR"
+    assert logged["message"] == "Failed to handle request"
+    assert "Traceback" in logged["exc_info"]
+    assert "RuntimeError: boom" in logged["exc_info"]
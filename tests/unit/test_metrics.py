@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import event, exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.metrics import InstrumentedPool, MetricsRegistry, PoolMetrics
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ["path"])
+    counter.inc(path="/a")
+    counter.inc(2, path='/"b"')
+    registry.gauge("in_flight", "In flight").set(3)
+
+    assert registry.counter("requests_total", "Requests", ["path"]) is counter
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{path="/\\"b\\""} 2.0',
+        'requests_total{path="/a"} 1.0',
+        "# HELP in_flight In flight",
+        "# TYPE in_flight gauge",
+        "in_flight 3.0",
+    ]
+
+
+def test_registry_rejects_conflicting_metrics() -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ["path"])
+
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "Requests", ["path"])
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests", ["method"])
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.get_count() == 4
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2.0',
+        'latency_seconds_bucket{le="1.0"} 3.0',
+        'latency_seconds_bucket{le="+Inf"} 4.0',
+        "latency_seconds_sum 5.65",
+        "latency_seconds_count 4.0",
+    ]
+
+
+def make_pool(registry: MetricsRegistry, pool_size: int = 1) -> InstrumentedPool:
+    pool = InstrumentedPool(
+        MagicMock, pool_size=pool_size, max_overflow=0, timeout=0.01
+    )
+    metrics = PoolMetrics(registry, "primary")
+    pool.metrics = metrics
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+    event.listen(pool, "connect", metrics.on_connect)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_follow_checkouts() -> None:
+    registry = MetricsRegistry()
+    pool = make_pool(registry, pool_size=2)
+    metrics = pool.metrics
+    assert metrics is not None
+
+    first = await greenlet_spawn(pool.connect)
+    second = await greenlet_spawn(pool.connect)
+    assert metrics.checked_out.get(pool="primary") == 2
+    first.close()
+    second.close()
+    third = await greenlet_spawn(pool.connect)
+
+    assert metrics.checked_out.get(pool="primary") == 1
+    assert metrics.checkouts.get(pool="primary") == 3
+    assert metrics.connects.get(pool="primary") == 2
+    assert metrics.checkout_wait.get_count(pool="primary") == 3
+    third.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_checkout_timeouts() -> None:
+    registry = MetricsRegistry()
+    pool = make_pool(registry)
+    metrics = pool.metrics
+    assert metrics is not None
+
+    connection = await greenlet_spawn(pool.connect)
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+    connection.close()
+
+    assert metrics.checkout_timeouts.get(pool="primary") == 1
+    assert metrics.checkout_wait.get_count(pool="primary") == 2
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+import pytest
+
+from app.core.cache import ActivityIndex, LRUResponseCacheBackend, ResponseCache
+from app.repositories.organization_repo import OrganizationRepo
+from app.services import organization_documents_service
+
+
+class LockResult:
+    def __init__(self, locked: bool) -> None:
+        self.locked = locked
+
+    def scalar_one(self) -> bool:
+        return self.locked
+
+
+class LockSession:
+    """Session of a worker whose try-lock returns `locked`."""
+
+    def __init__(self, locked: bool) -> None:
+        self.locked = locked
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> LockResult:
+        self.statements.append(str(statement))
+        return LockResult(self.locked)
+
+
+class FakeDatabaseConnection:
+    @asynccontextmanager
+    async def get_read_session(self) -> AsyncIterator[None]:
+        yield None
+
+
+class FakeOrganizationRepo:
+    rows: list[dict] | Exception = []
+
+    def __init__(self, session: Any) -> None:
+        pass
+
+    async def get_activity_tree(self) -> list[dict]:
+        if isinstance(self.rows, Exception):
+            raise self.rows
+        return self.rows
+
+
+@pytest.mark.asyncio
+async def test_warm_loads_activity_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        organization_documents_service, "OrganizationRepo", FakeOrganizationRepo
+    )
+    monkeypatch.setattr(
+        FakeOrganizationRepo, "rows", [{"id": 1, "name": "Еда", "ancestor_ids": [1]}]
+    )
+    activity_index = ActivityIndex()
+
+    await organization_documents_service.warm_activity_index(
+        FakeDatabaseConnection(), activity_index  # type: ignore[arg-type]
+    )
+
+    async def no_load() -> list[dict]:
+        raise AssertionError("the tree should already be loaded")
+
+    assert (await activity_index.get_tree(no_load)).get_id("Еда") == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_warm_is_logged_and_left_to_first_use(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr(
+        organization_documents_service, "OrganizationRepo", FakeOrganizationRepo
+    )
+    monkeypatch.setattr(
+        FakeOrganizationRepo, "rows", RuntimeError("relation does not exist")
+    )
+    activity_index = ActivityIndex()
+
+    with caplog.at_level(logging.WARNING):
+        await organization_documents_service.warm_activity_index(
+            FakeDatabaseConnection(), activity_index  # type: ignore[arg-type]
+        )
+
+    assert "Failed to load the activity index" in caplog.text
+
+    async def load() -> list[dict]:
+        return [{"id": 1, "name": "Еда", "ancestor_ids": [1]}]
+
+    assert (await activity_index.get_tree(load)).get_id("Еда") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("refreshed", [True, False])
+async def test_refresher_reloads_activity_index_and_drops_cached_responses(
+    monkeypatch: pytest.MonkeyPatch, refreshed: bool
+) -> None:
+    warmed: list[int] = []
+
+    async def refresh(db_connection: Any) -> bool:
+        return refreshed
+
+    async def warm(db_connection: Any, activity_index: ActivityIndex) -> None:
+        warmed.append(activity_index.version)
+
+    async def stop(interval: float) -> None:
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(
+        organization_documents_service, "refresh_organization_documents", refresh
+    )
+    monkeypatch.setattr(organization_documents_service, "warm_activity_index", warm)
+    monkeypatch.setattr(organization_documents_service.asyncio, "sleep", stop)
+    backend = LRUResponseCacheBackend(max_size=10)
+    await backend.set("by_id:[]", b"[]", ttl=60)
+    activity_index = ActivityIndex()
+    version = activity_index.version
+
+    with pytest.raises(asyncio.CancelledError):
+        await organization_documents_service.run_organization_documents_refresher(
+            None,  # type: ignore[arg-type]
+            activity_index,
+            ResponseCache(backend, ttl=60),
+            interval=30,
+        )
+
+    assert activity_index.version != version
+    assert warmed == [activity_index.version]
+    assert len(backend) == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_without_lock_waits_for_refresh_instead_of_running_it() -> None:
+    session = LockSession(locked=False)
+
+    refreshed = await OrganizationRepo(
+        session  # type: ignore[arg-type]
+    ).refresh_organization_documents()
+
+    assert not refreshed
+    assert len(session.statements) == 2
+    assert "pg_try_advisory_xact_lock" in session.statements[0]
+    assert "pg_advisory_xact_lock" in session.statements[1]
+
+
+@pytest.mark.asyncio
+async def test_worker_with_lock_refreshes_view() -> None:
+    session = LockSession(locked=True)
+
+    refreshed = await OrganizationRepo(
+        session  # type: ignore[arg-type]
+    ).refresh_organization_documents()
+
+    assert refreshed
+    assert session.statements[-1] == (
+        "REFRESH MATERIALIZED VIEW CONCURRENTLY organization_documents"
+    )
@@ -0,0 +1,53 @@
+import uuid
+from typing import Any
+
+import pytest
+
+from app.repositories.organization_repo import OrganizationRepo
+
+
+class FakeResult:
+    def freeze(self) -> "FakeResult":
+        return self
+
+    def __call__(self) -> "FakeResult":
+        return self
+
+    def fetchall(self) -> list:
+        return []
+
+    def scalar_one_or_none(self) -> None:
+        return None
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def execute(self, statement: Any) -> FakeResult:
+        self.calls.append(str(statement).split()[0])
+        return FakeResult()
+
+    async def close(self) -> None:
+        self.calls.append("close")
+
+
+@pytest.mark.asyncio
+async def test_read_releases_connection_after_each_statement() -> None:
+    session = FakeSession()
+    repo = OrganizationRepo(session)  # type: ignore[arg-type]
+
+    await repo.get_organization_by_id(uuid.uuid4())
+    await repo.get_activity_tree()
+
+    assert session.calls == ["SELECT", "close", "SELECT", "close"]
+
+
+@pytest.mark.asyncio
+async def test_transaction_keeps_connection_until_commit() -> None:
+    session = FakeSession()
+    repo = OrganizationRepo(session)  # type: ignore[arg-type]
+
+    await repo.search_organizations_full_info("кафе", limit=5, statement_timeout=200)
+
+    assert session.calls == ["BEGIN", "SELECT", "SELECT", "COMMIT", "close"]
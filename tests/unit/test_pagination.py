@@ -0,0 +1,21 @@
+import uuid
+
+import pytest
+
+from app.core.custom_exceptions import InvalidCursorError
+from app.core.utils import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip() -> None:
+    last_id = uuid.uuid4()
+
+    cursor = encode_cursor(last_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == last_id
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "AAAA", "тест"])
+def test_invalid_cursor_is_rejected(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
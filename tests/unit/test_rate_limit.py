@@ -0,0 +1,104 @@
+from typing import get_args
+
+import pytest
+
+from app.core.configs.settings import RateLimitSettings
+from app.core.rate_limit import (
+    ALGORITHMS,
+    InMemoryRateLimitBackend,
+    RateLimit,
+    RateLimitResult,
+    SlidingWindowLog,
+    TokenBucket,
+    rate_limit_headers,
+)
+
+LIMIT = RateLimit(rate=2, window=10, burst=3)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def hits(backend: InMemoryRateLimitBackend, count: int) -> list[bool]:
+    return [(await backend.hit("token", LIMIT)).allowed for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_and_refills() -> None:
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(TokenBucket(), max_keys=10, clock=clock)
+
+    assert await hits(backend, 4) == [True, True, True, False]
+
+    # 2 requests per 10 seconds refill one request every 5 seconds
+    clock.now = 5
+    assert await hits(backend, 2) == [True, False]
+
+    clock.now = 100
+    result = await backend.hit("token", LIMIT)
+    assert result.remaining == 2
+    assert result.reset_after == pytest.approx(5)
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_log_counts_requests_of_last_window() -> None:
+    clock = FakeClock()
+    backend = InMemoryRateLimitBackend(SlidingWindowLog(), max_keys=10, clock=clock)
+
+    assert await hits(backend, 2) == [True, True]
+    clock.now = 6
+    result = await backend.hit("token", LIMIT)
+    assert not result.allowed
+    assert result.retry_after == pytest.approx(4)
+
+    clock.now = 10
+    assert await hits(backend, 3) == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_key_is_evicted() -> None:
+    backend = InMemoryRateLimitBackend(TokenBucket(), max_keys=2, clock=FakeClock())
+    for key in ["first", "second", "first", "third"]:
+        await backend.hit(key, LIMIT)
+
+    assert len(backend) == 2
+    # "second" was evicted and starts over with a full bucket
+    assert (await backend.hit("second", LIMIT)).remaining == 2
+
+
+def test_headers_describe_refused_request() -> None:
+    result = RateLimitResult(
+        allowed=False, limit=100, remaining=0, reset_after=12.2, retry_after=0.4
+    )
+
+    assert rate_limit_headers(result) == {
+        "X-RateLimit-Limit": "100",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "13",
+        "Retry-After": "1",
+    }
+
+
+@pytest.mark.parametrize(
+    "rate, window, burst",
+    [(0, 10, 3), (-1, 10, 3), (2, 0, 3), (2, -10, 3), (2, 10, 0)],
+)
+def test_rate_limit_rejects_values_that_cannot_refill(
+    rate: int, window: float, burst: int
+) -> None:
+    with pytest.raises(ValueError):
+        RateLimit(rate=rate, window=window, burst=burst)
+
+
+def test_every_configurable_algorithm_is_registered() -> None:
+    algorithms = get_args(RateLimitSettings.model_fields["algorithm"].annotation)
+
+    assert set(algorithms) == set(ALGORITHMS)
+    assert ALGORITHMS["fixed_window"] is None
+    with pytest.raises(ValueError):
+        RateLimitSettings.model_validate({"RATE_LIMIT_ALGORITHM": "token_bukcet"})
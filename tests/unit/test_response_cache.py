@@ -0,0 +1,98 @@
+import uuid
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.core.cache import LRUResponseCacheBackend, ResponseCache
+from app.core.models.pydantic_models import Address, Organization
+
+organizations_adapter: TypeAdapter[list[Organization]] = TypeAdapter(list[Organization])
+
+
+def make_organization(name: str) -> Organization:
+    return Organization(
+        name=name,
+        phones_numbers=["2-222-222"],
+        address=Address(address="г. Москва, ул. Ленина 1", office=1),
+        activities=["Еда"],
+    )
+
+
+def test_make_key_normalizes_parameters() -> None:
+    org_id = uuid.uuid4()
+
+    assert ResponseCache.make_key("by_id", [org_id]) == ResponseCache.make_key(
+        "by_id", [str(org_id)]
+    )
+    assert ResponseCache.make_key("geo", [55.750, 37.6]) == ResponseCache.make_key(
+        "geo", [55.75, 37.60]
+    )
+    assert ResponseCache.make_key(
+        "activity", [], {"limit": 10, "activity": "Еда"}
+    ) == ResponseCache.make_key("activity", [], {"activity": "Еда", "limit": 10})
+    assert ResponseCache.make_key("a", ["Еда"]) != ResponseCache.make_key("b", ["Еда"])
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_calls_factory_once() -> None:
+    cache = ResponseCache(LRUResponseCacheBackend(max_size=10), ttl=60)
+    calls = 0
+
+    async def factory() -> list[Organization]:
+        nonlocal calls
+        calls += 1
+        return [make_organization("ООО Рога и Копыта")]
+
+    key = cache.make_key("activity", ["Еда"])
+    first = await cache.get_or_set(key, organizations_adapter, factory)
+    second = await cache.get_or_set(key, organizations_adapter, factory)
+
+    assert calls == 1
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_calls_factory() -> None:
+    cache = ResponseCache(LRUResponseCacheBackend(max_size=10), ttl=60, enabled=False)
+    calls = 0
+
+    async def factory() -> list[Organization]:
+        nonlocal calls
+        calls += 1
+        return []
+
+    key = cache.make_key("activity", ["Еда"])
+    await cache.get_or_set(key, organizations_adapter, factory)
+    await cache.get_or_set(key, organizations_adapter, factory)
+
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_backend_expires_and_evicts_entries() -> None:
+    backend = LRUResponseCacheBackend(max_size=2)
+    await backend.set("expired", b"[]", ttl=0)
+    assert await backend.get("expired") is None
+
+    await backend.set("first", b"1", ttl=60)
+    await backend.set("second", b"2", ttl=60)
+    await backend.get("first")
+    await backend.set("third", b"3", ttl=60)
+
+    assert len(backend) == 2
+    assert await backend.get("second") is None
+    assert await backend.get("first") == b"1"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_namespaces() -> None:
+    backend = LRUResponseCacheBackend(max_size=10)
+    cache = ResponseCache(backend, ttl=60)
+    await backend.set(cache.make_key("activity", ["Еда"]), b"[]", ttl=60)
+    await backend.set(cache.make_key("name", ["ИП Колбаскин"]), b"{}", ttl=60)
+
+    await cache.invalidate("activity")
+    assert len(backend) == 1
+
+    await cache.invalidate()
+    assert len(backend) == 0
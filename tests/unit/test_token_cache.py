@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.cache import TokenCache
+from app.core.configs.settings import TokenCacheSettings
+from app.core.rate_limit import RateLimit
+
+
+def test_consume_decreases_limit_and_records_usage() -> None:
+    cache = TokenCache(max_size=10, ttl=60)
+    cache.put(b"token", 2, datetime.now(timezone.utc))
+
+    assert cache.consume(b"token")
+    assert cache.consume(b"token")
+    assert not cache.consume(b"token")
+
+    usage = cache.drain()
+    assert usage[b"token"].used == 2
+    assert usage[b"token"].window_start is None
+    assert cache.drain() == {}
+
+
+def test_consume_resets_expired_window() -> None:
+    cache = TokenCache(max_size=10, ttl=60, window_limit=100)
+    cache.put(b"token", 0, datetime.now(timezone.utc) - timedelta(hours=2))
+
+    assert cache.consume(b"token")
+
+    quota = cache.get(b"token")
+    assert quota is not None
+    assert quota.limit == 99
+    usage = cache.drain()[b"token"]
+    assert usage.used == 1
+    assert usage.window_start is not None
+
+
+def test_naive_last_update_is_treated_as_utc() -> None:
+    cache = TokenCache(max_size=10, ttl=60)
+    last_update = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    quota = cache.put(b"token", 5, last_update)
+
+    assert quota.window_start.tzinfo is timezone.utc
+
+
+def test_expired_entries_are_not_returned() -> None:
+    cache = TokenCache(max_size=10, ttl=0)
+    cache.put(b"token", 5, datetime.now(timezone.utc))
+
+    assert cache.get(b"token") is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = TokenCache(max_size=2, ttl=60)
+    now = datetime.now(timezone.utc)
+    cache.put(b"first", 5, now)
+    cache.put(b"second", 5, now)
+    cache.get(b"first")
+
+    cache.put(b"third", 5, now)
+
+    assert len(cache) == 2
+    assert cache.get(b"second") is None
+    assert cache.get(b"first") is not None
+
+
+def test_reload_applies_unflushed_usage() -> None:
+    cache = TokenCache(max_size=10, ttl=60)
+    now = datetime.now(timezone.utc)
+    cache.put(b"token", 10, now)
+    cache.consume(b"token")
+    cache.consume(b"token")
+    cache.invalidate(b"token")
+
+    quota = cache.put(b"token", 10, now)
+
+    assert quota.limit == 8
+
+
+def test_restore_merges_usage_of_failed_flush() -> None:
+    cache = TokenCache(max_size=10, ttl=60)
+    cache.put(b"token", 10, datetime.now(timezone.utc))
+    cache.consume(b"token")
+    drained = cache.drain()
+    cache.consume(b"token")
+
+    cache.restore(drained)
+
+    assert cache.drain()[b"token"].used == 2
+
+
+def test_quota_uses_rate_limit_of_token() -> None:
+    cache = TokenCache(max_size=10, ttl=60)
+    rate_limit = RateLimit(rate=5, window=60, burst=5)
+    cache.put(
+        b"token", 0, datetime.now(timezone.utc) - timedelta(minutes=2), rate_limit
+    )
+
+    assert cache.consume(b"token")
+
+    quota = cache.get(b"token")
+    assert quota is not None
+    assert quota.limit == 4
+    result = quota.result(allowed=True)
+    assert result.limit == 5
+    assert result.reset_after == pytest.approx(60, abs=1)
+
+
+def test_cache_needs_room_for_one_token() -> None:
+    with pytest.raises(ValueError):
+        TokenCacheSettings(TOKEN_CACHE_MAX_SIZE=0)
+    with pytest.raises(ValueError):
+        TokenCache(max_size=0, ttl=30)
+
+    cache = TokenCache(max_size=1, ttl=30)
+    cache.put(b"token", 1, datetime.now(timezone.utc))
+    assert cache.consume(b"token")